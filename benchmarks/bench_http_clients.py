@@ -0,0 +1,77 @@
+"""
+Latency of outbound calls with a client per call and with the pooled clients.
+
+A stand-in Marketplace serving /healthz runs in-process on a free local port;
+the per-call numbers include a new TCP connection for every request, as the
+agent made before it kept one client per upstream.
+
+    python benchmarks/bench_http_clients.py --calls 1000
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+upstream = FastAPI()
+
+
+@upstream.get("/healthz")
+async def healthz():
+    return "ok"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(calls: int):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(upstream, port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    os.environ.setdefault("MAOTO_APIKEY", "bench")
+    os.environ.update(MAOTO_USE_SSL="false", MAOTO_DOMAIN_MP="127.0.0.1", MAOTO_PORT_MP=str(port))
+    from maoto_agent import Maoto
+
+    maoto = Maoto()
+    url = f"{maoto._settings.url_mp}healthz"
+    try:
+        started = time.perf_counter()
+        for _ in range(calls):
+            async with httpx.AsyncClient() as client:
+                (await client.get(url)).raise_for_status()
+        per_call = (time.perf_counter() - started) / calls
+
+        await maoto.health_marketplace()
+        started = time.perf_counter()
+        for _ in range(calls):
+            await maoto.health_marketplace()
+        pooled = (time.perf_counter() - started) / calls
+    finally:
+        await maoto.aclose()
+        server.should_exit = True
+        await serving
+
+    print(f"client per call: {per_call * 1e6:8.0f} us/call")
+    print(f"pooled client:   {pooled * 1e6:8.0f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Webhook throughput with the durable inbox off and in both synchronous modes.
+
+Events are posted in-process through the ASGI transport, so the numbers show
+the cost of persisting each event before it is acknowledged.
+
+    python benchmarks/bench_inbox.py --events 4000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault("MAOTO_APIKEY", "bench")
+os.environ.setdefault("MAOTO_LOOP_WATCHDOG", "false")
+
+import httpx  # noqa: E402
+
+from maoto_agent import Maoto, OfferCall  # noqa: E402
+
+
+def signed_body(maoto: Maoto) -> tuple[bytes, dict]:
+    event = OfferCall(
+        id=uuid.uuid4(),
+        time=datetime.now(timezone.utc),
+        apikey_id=uuid.uuid4(),
+        solver_id=None,
+        offercallable_id=uuid.uuid4(),
+        provider_id=None,
+        deputy_apikey_id=None,
+        args={},
+    )
+    body = event.model_dump_json().encode()
+    timestamp = str(int(time.time()))
+    signature = Maoto._make_signature(
+        "POST", "/OfferCall", timestamp, body, maoto._settings.apikey_hashed
+    )
+    return body, {"Signature": signature, "Timestamp": timestamp}
+
+
+async def run(mode: str, events: int, concurrency: int, directory: str) -> tuple[float, int]:
+    os.environ.pop("MAOTO_INBOX_PATH", None)
+    if mode != "off":
+        os.environ["MAOTO_INBOX_PATH"] = os.path.join(directory, f"{mode}.db")
+        os.environ["MAOTO_INBOX_SYNCHRONOUS"] = mode
+    os.environ["MAOTO_HANDLER_QUEUE_SIZE"] = str(events)
+    maoto = Maoto()
+
+    @maoto.register_handler(OfferCall)
+    async def handle(offercall):
+        pass
+
+    requests = [signed_body(maoto) for _ in range(events)]
+    semaphore = asyncio.Semaphore(concurrency)
+    async with maoto.router.lifespan_context(maoto):
+        transport = httpx.ASGITransport(app=maoto)
+        async with httpx.AsyncClient(transport=transport, base_url="http://agent") as client:
+
+            async def post(body, headers):
+                async with semaphore:
+                    response = await client.post("/OfferCall", content=body, headers=headers)
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(post(body, headers) for body, headers in requests))
+            elapsed = time.perf_counter() - started
+        commits = maoto._inbox.commits if maoto._inbox is not None else 0
+    return events / elapsed, commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("off", "NORMAL", "FULL"):
+            rate, commits = asyncio.run(run(mode, args.events, args.concurrency, directory))
+            print(f"inbox={mode:6}  {rate:8.0f} events/s  commits={commits}")
+
+
+if __name__ == "__main__":
+    main()
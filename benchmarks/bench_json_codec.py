@@ -0,0 +1,83 @@
+"""
+Encoding and decoding time of a large NewOfferResponse with each JSON path.
+
+The stdlib path is what the agent did before: dump the model to a dict and
+``json.dumps`` it, or ``json.loads`` the body and validate the dict. The
+pydantic path serialises and validates the bytes directly. Plain-data encoding
+is also timed with orjson when it is installed.
+
+    python benchmarks/bench_json_codec.py --sizes 100 1000 10000
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+
+from maoto_agent import MissingInfo, NewOfferCallable, NewOfferReference, NewOfferResponse
+from maoto_agent.json_codec import dumps, orjson
+
+
+def offer_response(n: int) -> NewOfferResponse:
+    return NewOfferResponse(
+        intent_id=uuid.uuid4(),
+        offerreference_ids=[uuid.uuid4() for _ in range(n)],
+        offercallable_ids=[uuid.uuid4() for _ in range(n)],
+        missinginfos=[MissingInfo(description="x" * 50) for _ in range(n)],
+        newoffercallables=[
+            NewOfferCallable(
+                solver_id=uuid.uuid4(),
+                description="desc " * 20,
+                params={"a": {"type": "string"}},
+                tags=["t1", "t2"],
+                followup=False,
+                cost=1.5,
+            )
+            for _ in range(n)
+        ],
+        newofferreferences=[
+            NewOfferReference(
+                solver_id=None,
+                description="ref " * 20,
+                params={},
+                tags=["x"],
+                followup=True,
+                cost=None,
+                url="https://example.com/x",
+            )
+            for _ in range(n)
+        ],
+    )
+
+
+def best_ms(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        response = offer_response(n)
+        raw = dumps(response)
+        data = response.model_dump(mode="json")
+        timings = {
+            "encode stdlib": lambda: json.dumps(response.model_dump(mode="json")).encode(),
+            "encode pydantic": lambda: dumps(response),
+            "decode stdlib": lambda: NewOfferResponse.model_validate(json.loads(raw)),
+            "decode pydantic": lambda: NewOfferResponse.model_validate_json(raw),
+            "dict encode stdlib": lambda: json.dumps(data).encode(),
+            "dict encode pydantic": lambda: dumps(data),
+        }
+        if orjson is not None:
+            timings["dict encode orjson"] = lambda: dumps(data, backend="orjson")
+        print(f"n={n} ({len(raw) / 1024:.0f} KiB)")
+        for name, func in timings.items():
+            print(f"  {name:22} {best_ms(func, args.number):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Time and peak memory of validating a JSON list of OfferCallables.
+
+Compares parsing the body with ``json.loads`` and validating each item with
+``model_validate``, as the agent did before, with validating the bytes in one
+pass through the cached ``list[OfferCallable]`` adapter.
+
+    python benchmarks/bench_list_validation.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import timeit
+import tracemalloc
+import uuid
+
+from maoto_agent import OfferCallable
+from maoto_agent.json_codec import list_adapter
+
+
+def offercallable() -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "time": "2024-01-01T00:00:00",
+        "apikey_id": str(uuid.uuid4()),
+        "solver_id": str(uuid.uuid4()),
+        "description": "offer description " * 4,
+        "params": {"q": {"type": "string"}},
+        "tags": ["a", "b"],
+        "followup": False,
+        "cost": 2.5,
+    }
+
+
+def peak_mib(func) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        raw = json.dumps([offercallable() for _ in range(n)]).encode()
+
+        def per_item():
+            return [OfferCallable.model_validate(item) for item in json.loads(raw)]
+
+        def adapter():
+            return list_adapter(OfferCallable).validate_json(raw)
+
+        number = max(1, 10000 // n)
+        timings = [
+            min(timeit.repeat(f, number=number, repeat=3)) / number * 1e3
+            for f in (per_item, adapter)
+        ]
+        peaks = [peak_mib(f) for f in (per_item, adapter)]
+        print(
+            f"n={n:6d} ({len(raw) / 2**20:.1f} MiB): "
+            f"{timings[0]:8.1f} ms -> {timings[1]:8.1f} ms, "
+            f"peak {peaks[0]:.0f} MiB -> {peaks[1]:.0f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
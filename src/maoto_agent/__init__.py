@@ -1 +1,4 @@
 from .maoto_agent import *
+from .retry import CircuitOpenError as CircuitOpenError
+from .tracing import RingBufferExporter as RingBufferExporter
+from .tracing import Span as Span
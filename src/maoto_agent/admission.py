@@ -0,0 +1,96 @@
+import math
+import time
+from typing import Callable
+
+from fastapi.responses import JSONResponse
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by observed handler latency.
+
+    Every completed event reports its latency from acceptance to completion.
+    While latency stays under ``target_latency`` the limit grows additively by
+    roughly one per round of completions; when it exceeds the target the limit
+    is cut multiplicatively by ``backoff``, at most once per target interval.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        target_latency: float,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.latency: float | None = None
+        self.rejected = 0
+        self._last_decrease = 0.0
+
+    def observe(self, latency: float):
+        self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+        if latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_decrease = now
+
+    def admits(self, in_flight: int) -> bool:
+        return in_flight < int(self.limit)
+
+    def retry_after(self, minimum: int) -> int:
+        return max(minimum, math.ceil(self.latency or 0))
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "latency": self.latency,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that sheds webhook deliveries while the agent is overloaded.
+
+    Requests to handler routes are refused with 503 and a ``Retry-After`` header
+    when the in-flight work exceeds the limiter, before the body is read.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: AdaptiveLimiter,
+        paths: set[str],
+        in_flight: Callable[[], int],
+        retry_after: int,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.paths = paths
+        self.in_flight = in_flight
+        self.min_retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"] in self.paths
+            and not self.limiter.admits(self.in_flight())
+        ):
+            self.limiter.rejected += 1
+            response = JSONResponse(
+                {"detail": "Agent overloaded"},
+                status_code=503,
+                headers={"Retry-After": str(self.limiter.retry_after(self.min_retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -1,5 +1,7 @@
-from functools import cached_property
 import hashlib
+from functools import cached_property
+from pathlib import Path
+from typing import Literal
 
 from pydantic import HttpUrl, SecretStr
 from pydantic_settings import BaseSettings
@@ -16,6 +18,71 @@ class AgentSettings(BaseSettings):
     logging_level: str = "INFO"
     agent_url: HttpUrl | None = None
 
+    http_timeout: float = 5.0
+    http_connect_timeout: float = 5.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    json_backend: Literal["pydantic", "orjson"] = "pydantic"
+    request_coalescing: bool = False
+
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 30.0
+    retry_budget_ratio: float = 0.2
+    retry_budget_min_per_second: float = 1.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    rate_limits: dict[str, float] = {}
+    rate_limit_burst_seconds: float = 1.0
+
+    registry_mirror: bool = False
+    registry_mirror_ttl: float = 300.0
+    registry_sync_concurrency: int = 16
+    send_intents_concurrency: int = 16
+    correlation_max_entries: int = 10_000
+    correlation_ttl: float = 300.0
+    quote_cache_max_entries: int = 10_000
+    quote_cache_ttl: float = 60.0
+    offercall_validation: Literal["off", "reject", "refund"] = "off"
+    metrics_enabled: bool = True
+    loop_watchdog: bool = True
+    loop_lag_interval: float = 0.1
+    loop_lag_threshold: float = 0.5
+    profiler_enabled: bool = False
+    profiler_max_seconds: float = 60.0
+
+    handler_workers: int = 4
+    handler_queue_size: int = 1000
+    handler_queue_full_policy: Literal["reject", "wait", "drop_oldest"] = "reject"
+    handler_max_concurrency: int = 16
+    handler_deadline_policy: Literal["drop", "flag"] = "drop"
+    handler_shutdown_timeout: float = 10.0
+    handler_thread_workers: int = 8
+    handler_process_workers: int | None = None
+    handler_process_start_method: Literal["spawn", "forkserver", "fork"] = "spawn"
+    inbox_path: Path | None = None
+    inbox_synchronous: Literal["NORMAL", "FULL"] = "FULL"
+
+    dedup_enabled: bool = True
+    dedup_ttl: float = 3600.0
+    dedup_max_entries: int = 100_000
+    dedup_path: Path | None = None
+
+    outbox_enabled: bool = False
+    outbox_path: Path | None = None
+    outbox_synchronous: Literal["NORMAL", "FULL"] = "FULL"
+    outbox_concurrency: int = 8
+    outbox_retry_delay: float = 1.0
+    outbox_max_retry_delay: float = 60.0
+    retry_after: int = 1
+
+    admission_control: bool = False
+    admission_initial_limit: int = 100
+    admission_min_limit: int = 4
+    admission_max_limit: int = 1000
+    admission_target_latency: float = 5.0
+
     @cached_property
     def protocol(self) -> str:
         return "https" if self.use_ssl else "http"
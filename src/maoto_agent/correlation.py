@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Hashable
+
+
+class _Entry:
+    def __init__(self, max_buffered: int):
+        self.buffered: deque = deque(maxlen=max_buffered)
+        self.subscribers: set[asyncio.Queue] = set()
+        self.expiry = 0.0
+
+
+class CorrelationTable:
+    """
+    Routes inbound responses to the callers waiting for them, by correlation key.
+
+    Responses published for a key nobody listens to yet are buffered, since a
+    webhook may arrive before the call that caused it has returned its id.
+    Buffered responses expire after ``ttl`` seconds and the table keeps at most
+    ``max_entries`` keys, evicting the least recently used ones without a listener
+    first, so responses that are never awaited do not accumulate.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, max_buffered: int = 64):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_buffered = max_buffered
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self.published = 0
+        self.delivered = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _purge(self, now: float):
+        expired = []
+        for key, entry in self._entries.items():
+            if entry.expiry > now:
+                break
+            if not entry.subscribers:
+                expired.append(key)
+        for key in expired:
+            self.expired += len(self._entries.pop(key).buffered)
+        while len(self._entries) > self.max_entries:
+            key = next((key for key, entry in self._entries.items() if not entry.subscribers), None)
+            if key is None:
+                break
+            self.evicted += len(self._entries.pop(key).buffered)
+
+    def _touch(self, key: Hashable, now: float) -> _Entry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(self.max_buffered)
+        entry.expiry = now + self.ttl
+        self._entries.move_to_end(key)
+        return entry
+
+    def publish(self, key: Hashable, response) -> bool:
+        """Hand ``response`` to the listeners of ``key``, or buffer it. Returns True if delivered."""
+        now = time.monotonic()
+        self.published += 1
+        entry = self._touch(key, now)
+        if entry.subscribers:
+            for queue in entry.subscribers:
+                queue.put_nowait(response)
+            self.delivered += 1
+            self._purge(now)
+            return True
+        entry.buffered.append(response)
+        self._purge(now)
+        return False
+
+    async def stream(self, key: Hashable, timeout: float | None = None) -> AsyncIterator:
+        """
+        Yield the responses for ``key``, starting with those already buffered.
+
+        The stream ends once no response arrived for ``timeout`` seconds.
+        """
+        now = time.monotonic()
+        entry = self._touch(key, now)
+        queue: asyncio.Queue = asyncio.Queue()
+        for response in entry.buffered:
+            queue.put_nowait(response)
+        if entry.buffered:
+            self.delivered += 1
+        entry.buffered.clear()
+        entry.subscribers.add(queue)
+        self._purge(now)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    return
+        finally:
+            entry.subscribers.discard(queue)
+            if not entry.subscribers and not entry.buffered and self._entries.get(key) is entry:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._entries),
+            "waiting": sum(len(entry.subscribers) for entry in self._entries.values()),
+            "buffered": sum(len(entry.buffered) for entry in self._entries.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
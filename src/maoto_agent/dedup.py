@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from .app_types import (
+    LinkConfirmation,
+    OfferCall,
+    OfferCallableCostRequest,
+    OfferCallResponse,
+    OfferReferenceCostRequest,
+    OfferRequest,
+    PaymentRequest,
+)
+
+
+class DedupBackend(ABC):
+    """
+    Store of delivery keys that were already accepted.
+
+    Subclass it to share deduplication state between worker processes,
+    e.g. through Redis or a database.
+    """
+
+    @abstractmethod
+    async def check_and_set(self, key: str, ttl: float) -> bool:
+        """Remember ``key`` for ``ttl`` seconds and return True if it was already known."""
+
+    @abstractmethod
+    async def forget(self, key: str):
+        """Remove ``key`` so the next delivery with it is accepted again."""
+
+    async def close(self):
+        pass
+
+
+class MemoryDedupBackend(DedupBackend):
+    """In-process LRU of delivery keys with per-key expiry and a bounded size."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, float] = OrderedDict()
+
+    async def check_and_set(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        expiry = self._entries.get(key)
+        if expiry is not None and expiry > now:
+            self._entries.move_to_end(key)
+            return True
+        self._entries[key] = now + ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return False
+
+    async def forget(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteDedupBackend(DedupBackend):
+    """
+    Delivery keys in a SQLite file, shared by all worker processes on one host.
+
+    Each check runs in its own immediate transaction, so concurrent processes
+    agree on which of them accepted a delivery first.
+    """
+
+    def __init__(self, path: Path | str, max_entries: int):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="maoto-dedup")
+        self._conn: sqlite3.Connection | None = None
+        self._checks = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None, timeout=30
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dedup (key TEXT PRIMARY KEY, expiry REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS dedup_expiry ON dedup (expiry)")
+            self._conn = conn
+        return self._conn
+
+    def _check_and_set(self, key: str, ttl: float) -> bool:
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT expiry FROM dedup WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] > now:
+                return True
+            conn.execute("INSERT OR REPLACE INTO dedup VALUES (?, ?)", (key, now + ttl))
+            self._checks += 1
+            if self._checks % 1000 == 0:
+                conn.execute("DELETE FROM dedup WHERE expiry <= ?", (now,))
+                conn.execute(
+                    "DELETE FROM dedup WHERE key IN ("
+                    "SELECT key FROM dedup ORDER BY expiry DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        return False
+
+    def _forget(self, key: str):
+        self._connect().execute("DELETE FROM dedup WHERE key = ?", (key,))
+
+    async def check_and_set(self, key: str, ttl: float) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._thread, self._check_and_set, key, ttl)
+
+    async def forget(self, key: str):
+        await asyncio.get_running_loop().run_in_executor(self._thread, self._forget, key)
+
+    async def close(self):
+        if self._conn is not None:
+            await asyncio.get_running_loop().run_in_executor(self._thread, self._conn.close)
+            self._conn = None
+
+
+DEFAULT_DEDUP_KEYS: dict[type, Callable[..., str]] = {
+    OfferCall: lambda event: str(event.id),
+    OfferCallResponse: lambda event: str(event.id),
+    OfferRequest: lambda event: f"{event.skill_id}:{event.intent.id}",
+    OfferCallableCostRequest: lambda event: f"{event.offercallable_id}:{event.intent.id}",
+    OfferReferenceCostRequest: lambda event: f"{event.offerreference_id}:{event.intent.id}",
+    PaymentRequest: lambda event: f"{event.offercall_id}:{event.payment_link}",
+    LinkConfirmation: lambda event: f"{event.pa_user_id}:{event.apikey_id}",
+}
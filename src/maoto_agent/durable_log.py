@@ -0,0 +1,123 @@
+import asyncio
+import sqlite3
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Literal
+
+
+class DurableLog:
+    """
+    Durable on-disk log of pending work items, backed by SQLite in WAL mode.
+
+    Used as the inbox of accepted events and as the outbox of outbound calls.
+    ``put`` returns once the item is committed, and requires the log to be
+    open. Writes that arrive while a commit is in progress are grouped into the
+    next transaction, so under load many items share one fsync. ``done``
+    removes a finished item lazily with the next successful commit. Items still
+    present on startup were never finished and are returned by ``unfinished``
+    for replay.
+    """
+
+    def __init__(
+        self, path: Path | str, name: str, synchronous: Literal["NORMAL", "FULL"] = "FULL"
+    ):
+        self.path = Path(path)
+        self.name = name
+        self.synchronous = synchronous
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"maoto-{name}")
+        self._conn: sqlite3.Connection | None = None
+        self._puts: list[tuple[str, str, bytes, asyncio.Future]] = []
+        self._dones: list[str] = []
+        self._wakeup = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+        self._closing = False
+        self.commits = 0
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.name} ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn = conn
+
+    def _write(self, puts: list[tuple[str, str, bytes]], dones: list[str]):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            if puts:
+                self._conn.executemany(f"INSERT INTO {self.name} VALUES (?, ?, ?)", puts)
+            if dones:
+                self._conn.executemany(
+                    f"DELETE FROM {self.name} WHERE id = ?", [(id,) for id in dones]
+                )
+
+    def _read(self) -> list[tuple[str, str, bytes]]:
+        return self._conn.execute(
+            f"SELECT id, kind, payload FROM {self.name} ORDER BY rowid"
+        ).fetchall()
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._thread, self._connect)
+        self._closing = False
+        self._flusher = asyncio.create_task(self._flush_loop(), name=f"maoto-{self.name}-flusher")
+
+    async def close(self):
+        if self._flusher is not None:
+            # Let a commit in progress finish; cancelling it could lose its writes.
+            self._closing = True
+            self._wakeup.set()
+            await self._flusher
+            self._flusher = None
+        if self._conn is not None:
+            loop = asyncio.get_running_loop()
+            await self._flush(loop)
+            await loop.run_in_executor(self._thread, self._conn.close)
+            self._conn = None
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while not self._closing:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self._flush(loop)
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop):
+        puts, self._puts = self._puts, []
+        dones, self._dones = self._dones, []
+        if not puts and not dones:
+            return
+        try:
+            await loop.run_in_executor(self._thread, self._write, [put[:3] for put in puts], dones)
+            self.commits += 1
+        except Exception as exc:
+            # Finished items must not be replayed, so their deletes wait for the next commit.
+            self._dones[:0] = dones
+            for *_, future in puts:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for *_, future in puts:
+            if not future.done():
+                future.set_result(None)
+
+    async def put(self, kind: str, payload: bytes) -> str:
+        if self._flusher is None or self._closing:
+            raise RuntimeError(f"The {self.name} log is not open")
+        id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._puts.append((id, kind, payload, future))
+        self._wakeup.set()
+        await future
+        return id
+
+    def done(self, id: str):
+        self._dones.append(id)
+        self._wakeup.set()
+
+    async def unfinished(self) -> list[tuple[str, str, bytes]]:
+        return await asyncio.get_running_loop().run_in_executor(self._thread, self._read)
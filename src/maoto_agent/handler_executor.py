@@ -0,0 +1,372 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Awaitable, Callable, Literal
+
+from loguru import logger
+
+from .tracing import Tracer, current_span
+
+QueueFullPolicy = Literal["reject", "wait", "drop_oldest"]
+DeadlinePolicy = Literal["drop", "flag"]
+
+
+class Priority(IntEnum):
+    """Scheduling priority of an event type. Lower values run first."""
+
+    URGENT = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class QueueFullError(Exception):
+    """Raised when an event cannot be queued because its handler queue is full."""
+
+
+class WaitStats:
+    """Wait-time statistics of one priority level over a sliding window of samples."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def add(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+        self._samples.append(wait)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class PriorityGate:
+    """
+    Concurrency gate shared by all handler workers.
+
+    At most ``capacity`` handlers run at once. Waiting workers are admitted by
+    priority first, then by earliest deadline, then in arrival order.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        self._waiters: list[tuple[int, float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int, deadline: float | None = None):
+        if self.active < self.capacity:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        key = math.inf if deadline is None else deadline
+        heapq.heappush(self._waiters, (priority, key, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.active -= 1
+        while self._waiters and self.active < self.capacity:
+            *_, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(None)
+
+
+class HandlerQueue:
+    """Bounded queue and worker pool for the handler of a single event type."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[..., Awaitable],
+        workers: int,
+        queue_size: int,
+        priority: Priority,
+        deadline: float | None,
+        executor: "HandlerExecutor",
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.priority = priority
+        self.deadline = deadline
+        self.executor = executor
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.expired = 0
+        self.duplicates = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    @property
+    def pending(self) -> int:
+        return self.depth + self.in_flight
+
+    def start(self):
+        while len(self._tasks) < self.workers:
+            task = asyncio.create_task(self._worker(), name=f"maoto-{self.name}-worker")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def stop(self, timeout: float | None):
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{self.pending} {self.name} events unfinished at shutdown")
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def hand_over(self, successor: "HandlerQueue"):
+        """Move the queued events to ``successor``, dropping those it has no room for."""
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            self.queue.task_done()
+            try:
+                successor.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                *_, done = item
+                if done is not None:
+                    done()
+                successor.dropped += 1
+                logger.warning(f"Dropped queued {self.name} event, replacement queue is full")
+
+    async def _worker(self):
+        gate = self.executor.gate
+        while True:
+            event, enqueued_at, trace, done = await self.queue.get()
+            self.in_flight += 1
+            try:
+                deadline = None if self.deadline is None else enqueued_at + self.deadline
+                await gate.acquire(self.priority, deadline)
+                try:
+                    now = time.monotonic()
+                    self.executor.wait_stats[self.priority].add(now - enqueued_at)
+                    tracer = self.executor.tracer
+                    if trace is not None:
+                        wall = time.time()
+                        tracer.record("queue " + self.name, wall - (now - enqueued_at), wall, trace)
+                    if deadline is not None and now > deadline:
+                        self.expired += 1
+                        if self.executor.deadline_policy == "drop":
+                            logger.warning(f"Dropped {self.name} event, deadline exceeded")
+                            continue
+                        logger.warning(f"Handling {self.name} event past its deadline")
+                    started = time.monotonic()
+                    try:
+                        with tracer.span("handle " + self.name, trace):
+                            await self.handler(event)
+                    except Exception:
+                        if self.executor.on_handled is not None:
+                            self.executor.on_handled(self.name, time.monotonic() - started, False)
+                        raise
+                    if self.executor.on_handled is not None:
+                        self.executor.on_handled(self.name, time.monotonic() - started, True)
+                    self.processed += 1
+                finally:
+                    gate.release()
+            except Exception:
+                self.failed += 1
+                logger.exception(f"Handler for {self.name} failed")
+            except asyncio.CancelledError:
+                done = None
+                raise
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+                if done is not None:
+                    done()
+                if self.executor.on_complete is not None:
+                    self.executor.on_complete(time.monotonic() - enqueued_at)
+
+    def stats(self) -> dict:
+        return {
+            "priority": self.priority.name,
+            "deadline": self.deadline,
+            "workers": self.workers,
+            "queue_size": self.queue.maxsize,
+            "queue_depth": self.depth,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "duplicates": self.duplicates,
+        }
+
+
+class HandlerExecutor:
+    """
+    Runs registered event handlers on bounded per-event-type queues.
+
+    Each event type gets its own queue and a fixed number of worker tasks, so a
+    burst of one event type cannot create unbounded tasks or starve the others.
+    When a queue is full, ``full_policy`` decides what happens to the new event:
+
+    - ``"reject"``: raise QueueFullError so the webhook can be refused.
+    - ``"wait"``: wait for free space, delaying the webhook response.
+    - ``"drop_oldest"``: discard the oldest queued event to make room.
+
+    Workers of all event types share a PriorityGate of ``max_concurrency``
+    slots, so urgent events start before less latency-sensitive ones. Events
+    still waiting after their deadline are dropped or, with the ``"flag"``
+    deadline policy, handled anyway and counted as expired.
+
+    ``on_complete`` is called with the time each event spent between being
+    queued and its handler finishing, ``on_handled`` with the event type name,
+    the handler's own run time and whether it succeeded. The ``done`` callback
+    passed to ``submit`` is called once the event leaves the executor, whether
+    it was handled, failed, expired or dropped. With an enabled ``tracer``,
+    the queue wait and the handler run are recorded as spans under the span
+    active when the event was submitted.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        max_concurrency: int,
+        full_policy: QueueFullPolicy = "reject",
+        deadline_policy: DeadlinePolicy = "drop",
+        on_complete: Callable[[float], None] | None = None,
+        on_handled: Callable[[str, float, bool], None] | None = None,
+        tracer: Tracer | None = None,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.full_policy = full_policy
+        self.deadline_policy = deadline_policy
+        self.on_complete = on_complete
+        self.on_handled = on_handled
+        self.tracer = tracer or Tracer()
+        self.gate = PriorityGate(max_concurrency)
+        self.wait_stats = {priority: WaitStats() for priority in Priority}
+        self._queues: dict[type, HandlerQueue] = {}
+        self._retiring: dict[HandlerQueue, asyncio.Task] = {}
+        self._running = False
+
+    def add(
+        self,
+        event_type: type,
+        handler: Callable[..., Awaitable],
+        priority: Priority = Priority.NORMAL,
+        deadline: float | None = None,
+        workers: int | None = None,
+        queue_size: int | None = None,
+    ):
+        """
+        Serve ``event_type`` with ``handler``. If it already has a queue, the queued
+        events move to the new one and the old workers exit once their current
+        event is handled.
+        """
+        queue = HandlerQueue(
+            event_type.__name__,
+            handler,
+            workers or self.workers,
+            queue_size or self.queue_size,
+            priority,
+            deadline,
+            self,
+        )
+        previous = self._queues.get(event_type)
+        self._queues[event_type] = queue
+        if previous is not None:
+            previous.hand_over(queue)
+            if previous._tasks:
+                self._retire(previous)
+        if self._running:
+            queue.start()
+
+    def _retire(self, queue: HandlerQueue):
+        task = asyncio.create_task(queue.stop(None))
+        self._retiring[queue] = task
+        task.add_done_callback(lambda _: self._retiring.pop(queue, None))
+
+    def start(self):
+        self._running = True
+        for queue in self._queues.values():
+            queue.start()
+
+    async def stop(self, timeout: float):
+        self._running = False
+        queues = [*self._queues.values(), *self._retiring]
+        await asyncio.gather(*(queue.stop(timeout) for queue in queues))
+
+    def handles(self, event_type: type) -> bool:
+        return event_type in self._queues
+
+    def record_duplicate(self, event_type: type):
+        self._queues[event_type].duplicates += 1
+
+    async def submit(
+        self,
+        event_type: type,
+        event,
+        done: Callable[[], None] | None = None,
+        wait: bool = False,
+    ):
+        if not self._running:
+            self.start()
+        queue = self._queues[event_type]
+        item = (event, time.monotonic(), current_span.get(), done)
+
+        if wait or self.full_policy == "wait":
+            await queue.queue.put(item)
+            return
+
+        if queue.queue.full():
+            if self.full_policy == "reject":
+                queue.rejected += 1
+                raise QueueFullError(f"Handler queue for {queue.name} is full")
+            *_, dropped_done = queue.queue.get_nowait()
+            queue.queue.task_done()
+            if dropped_done is not None:
+                dropped_done()
+            queue.dropped += 1
+            logger.warning(f"Dropped oldest queued {queue.name} event, queue is full")
+        queue.queue.put_nowait(item)
+
+    @property
+    def pending(self) -> int:
+        return sum(queue.pending for queue in (*self._queues.values(), *self._retiring))
+
+    def stats(self) -> dict[str, dict]:
+        return {queue.name: queue.stats() for queue in self._queues.values()}
+
+    def priority_stats(self) -> dict[str, dict]:
+        return {priority.name: stats.stats() for priority, stats in self.wait_stats.items()}
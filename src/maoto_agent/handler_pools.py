@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+import inspect
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal
+
+HandlerExecutorKind = Literal["async", "thread", "process"]
+
+
+def call_handler(func: Callable, event) -> Any:
+    """Run a synchronous handler outside the agent's event loop."""
+    result = func(event)
+    if inspect.isawaitable(result):
+        if inspect.iscoroutine(result):
+            result.close()
+        raise TypeError(
+            f"Handler {getattr(func, '__qualname__', func)!r} returned an awaitable. "
+            "Async handlers must run with executor='async'."
+        )
+    return result
+
+
+def check_pool_handler(func: Callable, kind: Literal["thread", "process"]):
+    """
+    Reject handlers that cannot run in the ``kind`` pool.
+
+    Async handlers would need an event loop of their own there, on which the
+    agent's pooled HTTP clients and locks do not work. Process handlers are sent
+    to the workers by reference, so they must be importable module-level
+    functions. This is checked structurally: when a decorator runs, the
+    module-level name is not bound yet, so the function cannot be pickled.
+    """
+    if inspect.iscoroutinefunction(func):
+        raise ValueError(
+            f"Async handler {func.__qualname__} cannot run with executor={kind!r}. "
+            "Use executor='async', or a synchronous function that returns its response."
+        )
+    if kind == "process":
+        qualname = getattr(func, "__qualname__", "")
+        if getattr(func, "__name__", None) == "<lambda>" or "<locals>" in qualname:
+            raise ValueError(
+                f"Handler {qualname or func!r} run in a process pool must be a module-level "
+                "function, not a lambda or a nested function."
+            )
+
+
+class HandlerPools:
+    """
+    Thread and process pools that run handlers off the event loop.
+
+    Thread handlers run in a copy of the caller's context, so context
+    variables such as the active trace span carry over. Process handlers
+    receive the validated event by pickle, which restores the model without
+    validating it again, and send their return value back the same way.
+    Both pools are created on first use.
+    """
+
+    def __init__(self, thread_workers: int, process_workers: int | None, start_method: str):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.start_method = start_method
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+        self.runs = {"thread": 0, "process": 0}
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix="maoto-handler"
+            )
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+        return self._process_pool
+
+    async def run(self, kind: Literal["thread", "process"], func: Callable, event) -> Any:
+        loop = asyncio.get_running_loop()
+        self.runs[kind] += 1
+        if kind == "thread":
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self.thread_pool, context.run, call_handler, func, event
+            )
+        return await loop.run_in_executor(self.process_pool, call_handler, func, event)
+
+    def shutdown(self):
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
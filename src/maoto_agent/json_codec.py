@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Any, Literal
+
+import pydantic_core
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JsonBackend = Literal["pydantic", "orjson"]
+
+
+def dumps(obj: BaseModel | Any, backend: JsonBackend = "pydantic") -> bytes:
+    """
+    Serialise a model or plain JSON data straight to bytes.
+
+    Models always go through their compiled pydantic serializer. Plain data uses
+    orjson when it is selected and installed, and pydantic-core otherwise.
+    """
+    if isinstance(obj, BaseModel):
+        return pydantic_core.to_json(obj)
+    if backend == "orjson" and orjson is not None:
+        return orjson.dumps(obj)
+    return pydantic_core.to_json(obj)
+
+
+def loads(data: bytes, backend: JsonBackend = "pydantic") -> Any:
+    """Parse JSON bytes into plain Python data."""
+    if backend == "orjson" and orjson is not None:
+        return orjson.loads(data)
+    return pydantic_core.from_json(data)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(item_type: type) -> TypeAdapter:
+    """Return the compiled ``list[item_type]`` validator, building it on first use."""
+    return TypeAdapter(list[item_type])
@@ -0,0 +1,79 @@
+import re
+
+_STRUCTURAL = re.compile(rb'[\[\]{}",]')
+_STRING = re.compile(rb'["\\]')
+
+
+class JsonArraySplitter:
+    """
+    Incrementally splits a top-level JSON array into the raw bytes of its elements.
+
+    Feed it the response body chunk by chunk; each call returns the elements
+    completed by that chunk. Only the current, unfinished element is buffered,
+    so memory stays bounded by the largest element rather than the whole array.
+    The elements themselves are not parsed.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._item_start: int | None = None
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        if self.finished:
+            return []
+        buffer = self._buffer
+        buffer += chunk
+        items = []
+        pos = self._pos
+        while True:
+            if self._in_string:
+                match = _STRING.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if buffer[match.start()] == 0x5C:  # backslash escapes the next byte
+                    if match.end() >= len(buffer):
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char = buffer[match.start()]
+            pos = match.end()
+            if char == 0x22:  # "
+                self._in_string = True
+            elif char in (0x5B, 0x7B):  # [ {
+                if self._depth == 0:
+                    if char != 0x5B:
+                        raise ValueError("Expected a JSON array")
+                    self._item_start = pos
+                self._depth += 1
+            elif char in (0x5D, 0x7D):  # ] }
+                self._depth -= 1
+                if self._depth == 0:
+                    item = bytes(buffer[self._item_start : match.start()]).strip()
+                    if item:
+                        items.append(item)
+                    self.finished = True
+                    break
+            elif self._depth == 1:  # , between elements
+                items.append(bytes(buffer[self._item_start : match.start()]).strip())
+                self._item_start = pos
+
+        keep = self._item_start if self._item_start is not None else pos
+        del buffer[:keep]
+        self._pos = pos - keep
+        if self._item_start is not None:
+            self._item_start = 0
+        return items
@@ -0,0 +1,146 @@
+import asyncio
+import inspect
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from types import CodeType, FrameType
+from typing import Callable
+
+from loguru import logger
+
+from .handler_executor import WaitStats
+
+
+class Stall:
+    """One period in which the event loop did not run for longer than the threshold."""
+
+    __slots__ = ("started", "duration", "handler", "event_type", "stack")
+
+    def __init__(
+        self, started: float, handler: str | None, event_type: str | None, stack: list[str]
+    ):
+        self.started = started
+        self.duration: float | None = None
+        self.handler = handler
+        self.event_type = event_type
+        self.stack = stack
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class LoopWatchdog:
+    """
+    Measures event loop lag and reports what blocked the loop.
+
+    A task on the loop sleeps for ``interval`` seconds at a time and records how
+    much later than requested it woke up. A daemon thread checks the heartbeat
+    of that task; once it is more than ``threshold`` seconds old the loop is
+    stalled, and the thread captures the stack the loop thread is executing. If
+    the stack runs through a watched handler, the stall is attributed to that
+    handler and its event type.
+    """
+
+    def __init__(self, interval: float, threshold: float, max_stalls: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = WaitStats()
+        self.stalls: deque[Stall] = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self.handlers: dict[CodeType, tuple[str, str]] = {}
+        self._heartbeat = time.monotonic()
+        self._open_stall: Stall | None = None
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def watch(self, handler: Callable, event_type: str):
+        """Attribute stalls whose stack passes through ``handler`` to ``event_type``."""
+        code = getattr(inspect.unwrap(handler), "__code__", None)
+        if code is not None:
+            self.handlers[code] = (getattr(handler, "__qualname__", code.co_name), event_type)
+
+    def attribute(self, frame: FrameType | None) -> tuple[str, str] | None:
+        """Return the watched handler and event type the stack of ``frame`` runs through."""
+        while frame is not None:
+            match = self.handlers.get(frame.f_code)
+            if match is not None:
+                return match
+            frame = frame.f_back
+        return None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(
+            target=self._monitor, name="maoto-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _tick(self):
+        # Measured from the heartbeat set in start(), so a stall before the first tick counts.
+        expected = self._heartbeat + self.interval
+        while True:
+            await asyncio.sleep(max(0.0, expected - time.monotonic()))
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            expected = now + self.interval
+            self.lag.add(lag)
+            self._heartbeat = now
+            stall = self._open_stall
+            if stall is not None:
+                self._open_stall = None
+                stall.duration = lag
+                logger.warning(
+                    f"Event loop was blocked for {lag:.3f}s"
+                    + (f" by {stall.event_type} handler {stall.handler}" if stall.handler else "")
+                )
+
+    def _monitor(self):
+        while not self._stop.wait(min(self.interval, self.threshold) / 2):
+            if self._open_stall is not None:
+                continue
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked > self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None and self._heartbeat == heartbeat:
+                    self._record(frame, blocked)
+
+    def _record(self, frame: FrameType, blocked: float):
+        handler, event_type = self.attribute(frame) or (None, None)
+        stack = traceback.format_stack(frame)
+        stall = Stall(time.time() - blocked, handler, event_type, stack)
+        self._open_stall = stall
+        self.stalls.append(stall)
+        self.stall_count += 1
+        logger.warning(
+            f"Event loop blocked for more than {self.threshold}s"
+            + (f" in {event_type} handler {handler}" if handler else "")
+            + ":\n"
+            + "".join(stack[-10:])
+        )
+
+    def stats(self) -> dict:
+        return {
+            **self.lag.stats(),
+            "stalls": self.stall_count,
+            "recent_stalls": [stall.to_dict() for stall in self.stalls],
+        }
@@ -1,5 +1,10 @@
 import asyncio
+import inspect
+import json
+import threading
+import time
 import uuid
+from contextlib import aclosing, asynccontextmanager
 from importlib.metadata import version
 from importlib.resources import files
 from typing import Literal
@@ -7,21 +12,65 @@ from urllib.parse import urljoin
 
 import httpx
 from fastapi import FastAPI, Request, Header, HTTPException, Depends, APIRouter
+from fastapi.exceptions import RequestValidationError
 import hmac
 import hashlib
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
-from typing import Sequence
-from pydantic import BaseModel, HttpUrl
+from typing import AsyncIterable, AsyncIterator, Callable, Hashable, Iterable, Sequence
+from pydantic import BaseModel, HttpUrl, ValidationError
+from pydantic.json_schema import models_json_schema
 
+from .admission import AdaptiveLimiter, AdmissionMiddleware
 from .agent_settings import AgentSettings
 from .app_types import *
+from .correlation import CorrelationTable
+from .dedup import DEFAULT_DEDUP_KEYS, DedupBackend, MemoryDedupBackend, SQLiteDedupBackend
+from .durable_log import DurableLog
+from .handler_executor import HandlerExecutor, Priority, QueueFullError
+from .handler_pools import HandlerExecutorKind, HandlerPools, check_pool_handler
+from .json_codec import dumps, list_adapter, loads
+from .json_stream import JsonArraySplitter
+from .loop_watchdog import LoopWatchdog
+from .metrics import MetricsRegistry
+from .offer_router import OfferRouter
+from .outbox import Outbox, OutboxTicket
+from .params_schema import ParamsValidators
+from .profiler import ProfileRequest, SamplingProfiler
+from .quote_cache import COST_RESPONSE_TYPES, QuoteCache, current_quote
+from .rate_limit import RateLimiter
+from .registry_mirror import RegistryMirror
+from .registry_sync import REGISTERED_TYPES, RegistrySyncReport, plan_sync
+from .retry import (
+    CONNECT_ERRORS,
+    CircuitBreaker,
+    RetryBudget,
+    RetryPolicy,
+    is_retryable,
+    parse_retry_after,
+)
+from .tracing import SpanExporter, Tracer, correlation_attributes, current_span
+
+_RESPONSE_TYPES = (
+    NewOfferResponse,
+    NewOfferCallResponse,
+    NewOfferCallableCostResponse,
+    NewOfferReferenceCostResponse,
+)
 
 
 class Maoto(FastAPI):    
-    def __init__(self, apikey: SecretStr | None = None, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(
+        self,
+        apikey: SecretStr | None = None,
+        *args,
+        dedup_backend: DedupBackend | None = None,
+        span_exporter: SpanExporter | None = None,
+        **kwargs,
+    ):
+        self._user_lifespan = kwargs.pop("lifespan", None)
+        super().__init__(*args, lifespan=self._lifespan, **kwargs)
 
         settings_kwargs = {}
         if apikey is not None:
@@ -32,6 +81,18 @@ class Maoto(FastAPI):
 
         logger.remove()
 
+        self.metrics = MetricsRegistry()
+        self.tracer = Tracer(span_exporter)
+        self._watchdog = LoopWatchdog(
+            self._settings.loop_lag_interval, self._settings.loop_lag_threshold
+        )
+        self._profiler = SamplingProfiler(self._watchdog.attribute)
+        self._pools = HandlerPools(
+            self._settings.handler_thread_workers,
+            self._settings.handler_process_workers,
+            self._settings.handler_process_start_method,
+        )
+        self._setup_metrics()
         self._setup_routes()
 
         self._version = version("maoto_agent")
@@ -39,6 +100,99 @@ class Maoto(FastAPI):
             "Authorization": self._settings.apikey.get_secret_value(),
             "Version": self._version,
         }
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._retry_policy = RetryPolicy(
+            max_attempts=self._settings.retry_max_attempts,
+            base_delay=self._settings.retry_base_delay,
+            max_delay=self._settings.retry_max_delay,
+        )
+        self._retry_budget = RetryBudget(
+            ratio=self._settings.retry_budget_ratio,
+            min_per_second=self._settings.retry_budget_min_per_second,
+        )
+        self._retries = 0
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._coalescing = {"requests": 0, "coalesced": 0}
+        self._rate_limiter = RateLimiter(
+            self._settings.rate_limits, self._settings.rate_limit_burst_seconds
+        )
+        self._breakers = {
+            str(url): CircuitBreaker(
+                name,
+                failure_threshold=self._settings.breaker_failure_threshold,
+                reset_timeout=self._settings.breaker_reset_timeout,
+                probe=probe,
+            )
+            for name, url, probe in (
+                ("marketplace", self._settings.url_mp, self.health_marketplace),
+                ("assistant", self._settings.url_pa, self.health_assistant),
+            )
+        }
+        self._limiter = AdaptiveLimiter(
+            initial_limit=self._settings.admission_initial_limit,
+            min_limit=self._settings.admission_min_limit,
+            max_limit=self._settings.admission_max_limit,
+            target_latency=self._settings.admission_target_latency,
+        )
+        self._executor = HandlerExecutor(
+            workers=self._settings.handler_workers,
+            queue_size=self._settings.handler_queue_size,
+            max_concurrency=self._settings.handler_max_concurrency,
+            full_policy=self._settings.handler_queue_full_policy,
+            deadline_policy=self._settings.handler_deadline_policy,
+            on_complete=self._limiter.observe,
+            on_handled=self._record_handled,
+            tracer=self.tracer,
+        )
+        self._handler_paths: set[str] = set()
+        self._webhook_models: set[type[BaseModel]] = set()
+        self._correlations = CorrelationTable(
+            self._settings.correlation_max_entries, self._settings.correlation_ttl
+        )
+        self._quotes = QuoteCache(
+            self._settings.quote_cache_max_entries, self._settings.quote_cache_ttl
+        )
+        self.registry = RegistryMirror(self._fetch_registry, ttl=self._settings.registry_mirror_ttl)
+        self._offer_router = OfferRouter(self._skill_tags)
+        self._params_validators = ParamsValidators(lambda id: self.registry.get(OfferCallable, id))
+        self._inbox = (
+            DurableLog(
+                self._settings.inbox_path, "inbox", synchronous=self._settings.inbox_synchronous
+            )
+            if self._settings.inbox_path is not None
+            else None
+        )
+        self._background_tasks: set[asyncio.Task] = set()
+        self._draining_tasks: set[asyncio.Task] = set()
+        self._outbox = Outbox(
+            self._deliver,
+            concurrency=self._settings.outbox_concurrency,
+            retry_delay=self._settings.outbox_retry_delay,
+            max_retry_delay=self._settings.outbox_max_retry_delay,
+            log=DurableLog(
+                self._settings.outbox_path,
+                "outbox",
+                synchronous=self._settings.outbox_synchronous,
+            )
+            if self._settings.outbox_path is not None
+            else None,
+        )
+        if dedup_backend is not None:
+            self._dedup = dedup_backend
+        elif self._settings.dedup_path is not None:
+            self._dedup = SQLiteDedupBackend(
+                self._settings.dedup_path, self._settings.dedup_max_entries
+            )
+        else:
+            self._dedup = MemoryDedupBackend(self._settings.dedup_max_entries)
+        if self._settings.admission_control:
+            self.add_middleware(
+                AdmissionMiddleware,
+                limiter=self._limiter,
+                paths=self._handler_paths,
+                in_flight=lambda: self._executor.pending,
+                retry_after=self._settings.retry_after,
+            )
 
         self.supported_event_types = {
                 OfferCall: "Represents a request to initiate an offer-related call or interaction.",
@@ -55,6 +209,350 @@ class Maoto(FastAPI):
                 PAPaymentRequest: "Personal assistant version of a payment request, possibly with more context or user-specific handling.",
             }
 
+        self.event_priorities = {
+                OfferCallableCostRequest: Priority.URGENT,
+                OfferReferenceCostRequest: Priority.URGENT,
+                OfferRequest: Priority.URGENT,
+                OfferCall: Priority.NORMAL,
+                OfferCallResponse: Priority.NORMAL,
+                PaymentRequest: Priority.NORMAL,
+                PALocationRequest: Priority.NORMAL,
+                PALinkUrl: Priority.NORMAL,
+                PAPaymentRequest: Priority.NORMAL,
+                IntentResponse: Priority.LOW,
+                LinkConfirmation: Priority.LOW,
+                PAUserMessage: Priority.LOW,
+            }
+        self.event_deadlines: dict[type, float | None] = {}
+        self.dedup_keys = dict(DEFAULT_DEDUP_KEYS)
+        self.correlation_keys = {
+            IntentResponse: lambda event: event.intent_id,
+            OfferCallResponse: lambda event: event.offercall_id,
+        }
+        self.quote_keys = self._quotes.key_funcs
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        for url in (self._settings.url_mp, self._settings.url_pa):
+            self._get_client(url)
+        self._executor.start()
+        if self._settings.loop_watchdog:
+            self._watchdog.start()
+        if self._inbox is not None:
+            await self._inbox.open()
+            self._spawn(self._replay_inbox())
+        if self._settings.outbox_enabled:
+            await self._outbox.start()
+        if self._settings.registry_mirror:
+            self._spawn(self.registry.run())
+        try:
+            # Handlers added with `on_event` only run in the default lifespan, which this replaces.
+            await self._run_event_handlers(self.router.on_startup)
+            if self._user_lifespan is None:
+                yield
+            else:
+                async with self._user_lifespan(app) as state:
+                    yield state
+            await self._run_event_handlers(self.router.on_shutdown)
+        finally:
+            if self._draining_tasks:
+                _, unfinished = await asyncio.wait(
+                    self._draining_tasks, timeout=self._settings.handler_shutdown_timeout
+                )
+                if unfinished:
+                    logger.warning(f"{len(unfinished)} outbound calls unsent at shutdown")
+                    for task in unfinished:
+                        task.cancel()
+                    await asyncio.gather(*unfinished, return_exceptions=True)
+            for task in list(self._background_tasks):
+                task.cancel()
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+            await self._executor.stop(self._settings.handler_shutdown_timeout)
+            await self._watchdog.stop()
+            self._pools.shutdown()
+            if self._inbox is not None:
+                await self._inbox.close()
+            await self._dedup.close()
+            await self.aclose()
+
+    @staticmethod
+    async def _run_event_handlers(handlers: Sequence[Callable]):
+        for handler in handlers:
+            result = handler()
+            if inspect.isawaitable(result):
+                await result
+
+    def _spawn(self, coro, drain: bool = False) -> asyncio.Task:
+        """
+        Run a coroutine in the background, keeping a reference until it finishes.
+
+        Background tasks are cancelled at shutdown, unless `drain` is set: those are
+        outbound calls owed for events already acknowledged, and are waited for up
+        to `MAOTO_HANDLER_SHUTDOWN_TIMEOUT` seconds first.
+        """
+        task = asyncio.create_task(coro)
+        tasks = self._draining_tasks if drain else self._background_tasks
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return task
+
+    async def _fetch_registry(self, type_ref: type) -> list:
+        if type_ref is RefCode:
+            return await self.get_refcodes()
+        return await self.get_registered(type_ref)
+
+    async def _replay_inbox(self):
+        event_types = {event_type.__name__: event_type for event_type in self.supported_event_types}
+        replayed = 0
+        for id, name, payload in await self._inbox.unfinished():
+            event_type = event_types.get(name)
+            if event_type is None or not self._executor.handles(event_type):
+                logger.warning(f"No handler registered for unfinished {name} event {id}")
+                continue
+            event = event_type.model_validate_json(payload)
+            await self._executor.submit(
+                event_type, event, done=lambda id=id: self._inbox.done(id), wait=True
+            )
+            replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} unfinished events from the inbox")
+
+    def _dedup_key(self, event_type: type, event: BaseModel, request: Request) -> str:
+        key_func = self.dedup_keys.get(event_type)
+        if key_func is not None:
+            return f"{event_type.__name__}:{key_func(event)}"
+        signature = request.headers.get("Signature")
+        timestamp = request.headers.get("Timestamp")
+        return f"{event_type.__name__}:{signature}:{timestamp}"
+
+    @staticmethod
+    def _parse_event(event_type: type[BaseModel], body: bytes) -> BaseModel:
+        try:
+            return event_type.model_validate_json(body)
+        except ValidationError as exc:
+            errors = [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()]
+            raise RequestValidationError(errors, body=body)
+
+    async def _accept(self, event_type: type, request: Request):
+        name = event_type.__name__
+        root = getattr(request.state, "trace_root", None)
+        try:
+            with self.tracer.activate(root):
+                outcome = await self._admit(event_type, request)
+        except RequestValidationError as exc:
+            self._events_total.inc(name, "invalid")
+            self.tracer.end_span(root, exc)
+            raise
+        except HTTPException as exc:
+            self._events_total.inc(name, "rejected")
+            self.tracer.end_span(root, exc)
+            raise
+        self._events_total.inc(name, outcome)
+        if root is not None:
+            root.set_attribute("outcome", outcome)
+            self.tracer.end_span(root)
+
+    async def _admit(self, event_type: type, request: Request) -> str:
+        """
+        Validate an inbound event straight from the raw body, drop redeliveries and
+        dispatch the rest. Returns what became of the event.
+        """
+        body = await request.body()
+        with self.tracer.span("parse " + event_type.__name__):
+            event = self._parse_event(event_type, body)
+        span = current_span.get()
+        if span is not None:
+            span.attributes.update(correlation_attributes(event))
+
+        dedup_key = None
+        if self._settings.dedup_enabled:
+            dedup_key = self._dedup_key(event_type, event, request)
+            if await self._dedup.check_and_set(dedup_key, self._settings.dedup_ttl):
+                if self._executor.handles(event_type):
+                    self._executor.record_duplicate(event_type)
+                return "duplicate"
+
+        try:
+            return await self._dispatch(event_type, event, body)
+        except BaseException:
+            # The client is answered with an error, so its retry must not be taken for a duplicate.
+            if dedup_key is not None:
+                await self._dedup.forget(dedup_key)
+            raise
+
+    async def _dispatch(self, event_type: type, event: BaseModel, body: bytes) -> str:
+        """Hand a new event to its handler, persisting it first if the inbox is enabled."""
+        correlation_key = self.correlation_keys.get(event_type)
+        if correlation_key is not None:
+            self._correlations.publish((event_type, correlation_key(event)), event)
+        if not self._executor.handles(event_type):
+            return "unhandled"
+
+        if event_type is OfferCall and self._settings.offercall_validation != "off":
+            errors = self._params_validators.validate(event)
+            if errors:
+                if self._settings.offercall_validation == "refund":
+                    logger.warning(f"Refunding OfferCall {event.id} with invalid args: {errors}")
+                    self._spawn(self._refund_invalid(event), drain=True)
+                    return "refunded"
+                raise RequestValidationError(
+                    [{**error, "loc": ("body", *error["loc"])} for error in errors], body=body
+                )
+
+        if event_type in COST_RESPONSE_TYPES:
+            quote = self._quotes.get(event)
+            if quote is not None:
+                self._spawn(self._send_cached_quote(quote), drain=True)
+                return "cached"
+
+        done = None
+        if self._inbox is not None:
+            id = await self._inbox.put(event_type.__name__, body)
+            done = lambda: self._inbox.done(id)  # noqa: E731
+        try:
+            await self._executor.submit(event_type, event, done=done)
+        except QueueFullError as exc:
+            if done is not None:
+                done()
+            raise HTTPException(
+                429, str(exc), headers={"Retry-After": str(self._settings.retry_after)}
+            )
+        return "queued"
+
+    def _skill_tags(self, skill_id: uuid.UUID) -> list[str] | None:
+        skill = self.registry.get(Skill, skill_id)
+        return None if skill is None else skill.tags
+
+    async def _refund_invalid(self, offercall: OfferCall):
+        try:
+            await self.refund_offercall(offercall)
+        except Exception:
+            logger.exception(f"Refunding invalid OfferCall {offercall.id} failed")
+
+    async def _send_cached_quote(self, quote: BaseModel):
+        try:
+            await self.send_response(quote)
+        except Exception:
+            logger.exception(f"Sending cached {type(quote).__name__} failed")
+
+    def _get_client(self, url: HttpUrl) -> httpx.AsyncClient:
+        """Return the pooled client for an upstream, creating it on first use."""
+        key = str(url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers=self._headers,
+                timeout=httpx.Timeout(
+                    self._settings.http_timeout, connect=self._settings.http_connect_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=self._settings.http_max_connections,
+                    max_keepalive_connections=self._settings.http_max_keepalive_connections,
+                    keepalive_expiry=self._settings.http_keepalive_expiry,
+                ),
+            )
+            self._clients[key] = client
+        return client
+
+    async def aclose(self):
+        """
+        Close the pooled HTTP clients used for outbound calls.
+
+        Called automatically on application shutdown. Call it yourself when using
+        Maoto as a plain client outside of a running server. Calls still queued in
+        the outbox are given `MAOTO_HANDLER_SHUTDOWN_TIMEOUT` seconds to be sent first.
+
+        Examples
+        --------
+        >>> await maoto.register(new_skill)
+        >>> await maoto.aclose()
+        """
+        await self._outbox.stop(self._settings.handler_shutdown_timeout)
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def _setup_metrics(self):
+        metrics = self.metrics
+        self._events_total = metrics.counter(
+            "maoto_events_total",
+            "Inbound webhook events by type and outcome.",
+            ("event_type", "outcome"),
+        )
+        self._handler_duration = metrics.histogram(
+            "maoto_handler_duration_seconds",
+            "Run time of event handlers.",
+            ("event_type", "status"),
+        )
+        self._hmac_failures = metrics.counter(
+            "maoto_hmac_failures_total", "Inbound requests with an invalid signature."
+        )
+        metrics.gauge(
+            "maoto_handler_queue_depth",
+            "Events waiting in the handler queue.",
+            lambda: {(name,): stats["queue_depth"] for name, stats in self.handler_stats().items()},
+            ("event_type",),
+        )
+        metrics.gauge(
+            "maoto_handler_in_flight",
+            "Events currently being handled.",
+            lambda: {(name,): stats["in_flight"] for name, stats in self.handler_stats().items()},
+            ("event_type",),
+        )
+        self._outbound_duration = metrics.histogram(
+            "maoto_outbound_request_duration_seconds",
+            "Latency of outbound request attempts.",
+            ("upstream", "route"),
+        )
+        self._outbound_responses = metrics.counter(
+            "maoto_outbound_responses_total",
+            'Outbound request attempts by status code, or "error" for transport errors.',
+            ("upstream", "route", "status"),
+        )
+        self._outbound_retries = metrics.counter(
+            "maoto_outbound_retries_total", "Retried outbound requests.", ("upstream", "route")
+        )
+        metrics.gauge(
+            "maoto_quote_cache_hits_total",
+            "Cost requests answered from the quote cache.",
+            lambda: {(name,): hits for name, hits in self._quotes.counts("hits").items()},
+            ("request_type",),
+            kind="counter",
+        )
+        metrics.gauge(
+            "maoto_quote_cache_misses_total",
+            "Cost requests with a quote key that were not found in the quote cache.",
+            lambda: {(name,): misses for name, misses in self._quotes.counts("misses").items()},
+            ("request_type",),
+            kind="counter",
+        )
+        metrics.gauge(
+            "maoto_quote_cache_entries",
+            "Quotes currently cached.",
+            lambda: {(): len(self._quotes)},
+        )
+        metrics.gauge(
+            "maoto_event_loop_lag_seconds",
+            "Event loop lag over the recent samples, by quantile; 1 is the maximum since start.",
+            self._loop_lag_quantiles,
+            ("quantile",),
+        )
+        metrics.gauge(
+            "maoto_event_loop_stalls_total",
+            "Times the event loop was blocked for longer than the watchdog threshold.",
+            lambda: {(): self._watchdog.stall_count},
+            kind="counter",
+        )
+
+    def _loop_lag_quantiles(self) -> dict[tuple, float]:
+        lag = self._watchdog.lag
+        quantiles = {(str(q),): lag.percentile(q) for q in (0.5, 0.95, 0.99)}
+        quantiles[("1",)] = lag.max
+        return quantiles
+
+    def _record_handled(self, event_type: str, duration: float, ok: bool):
+        self._handler_duration.observe(duration, event_type, "ok" if ok else "error")
+
     def _setup_routes(self):
         @self.get("/healthz", include_in_schema=False)
         async def healthz_check():
@@ -62,9 +560,51 @@ class Maoto(FastAPI):
 
         @self.get("/health", include_in_schema=False)
         async def human_health_check():
-            return {"status":"ok"}
+            if not self._settings.loop_watchdog:
+                return {"status":"ok"}
+            lag = self._watchdog.lag.stats()
+            return {
+                "status": "ok",
+                "event_loop": {key: lag[key] for key in ("p50", "p95", "p99", "max")}
+                | {"stalls": self._watchdog.stall_count},
+            }
+
+        if self._settings.metrics_enabled:
+
+            @self.get("/metrics", include_in_schema=False)
+            async def metrics():
+                return PlainTextResponse(
+                    self.metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+                )
+
+        if self._settings.profiler_enabled:
+
+            @self.post(
+                "/debug/profile", include_in_schema=False, dependencies=[Depends(self._verify_hmac)]
+            )
+            async def profile(request: Request):
+                """
+                Sample the running process and return collapsed stacks for a flame graph.
+
+                The signed JSON body may set "seconds" (default 10), "interval" between
+                samples (default 0.005) and "threads": "loop" (default) or "all".
+                """
+                options = self._parse_event(ProfileRequest, await request.body() or b"{}")
+                if options.seconds > self._settings.profiler_max_seconds:
+                    raise HTTPException(
+                        400, f"seconds must not exceed {self._settings.profiler_max_seconds}"
+                    )
+                thread_ids = {threading.get_ident()} if options.threads == "loop" else None
+                try:
+                    stacks = await asyncio.to_thread(
+                        self._profiler.profile, options.seconds, options.interval, thread_ids
+                    )
+                except RuntimeError as exc:
+                    raise HTTPException(409, str(exc))
+                return PlainTextResponse(self._profiler.collapse(stacks))
 
         static_path = files("maoto_agent").joinpath("assets")
+
         @self.get("/favicon.ico", include_in_schema=False)
         async def favicon():
             return FileResponse(static_path / "favicon.ico")
@@ -85,14 +625,72 @@ class Maoto(FastAPI):
             | PALinkUrl
             | PAPaymentRequest
         ],
+        workers: int | None = None,
+        queue_size: int | None = None,
+        priority: Priority | None = None,
+        deadline: float | None = None,
+        quote_key: Callable[[BaseModel], Hashable] | None = None,
+        skill_id: uuid.UUID | None = None,
+        solver_id: uuid.UUID | None = None,
+        tags: list[str] | None = None,
+        executor: HandlerExecutorKind | None = None,
     ):
         """
         Decorator to register a handler function for a specific event type.
 
+        Incoming events are acknowledged immediately and queued for the handler.
+        Each event type has its own bounded queue served by a fixed number of workers.
+        At most `MAOTO_HANDLER_MAX_CONCURRENCY` handlers run at once; when handlers
+        have to wait, events of more urgent priority start first.
+
+        With `MAOTO_OFFERCALL_VALIDATION` set to "reject" or "refund", the args of an
+        OfferCall are checked against the `params` of its OfferCallable before it is
+        queued. Invalid calls are answered with 422 or refunded, and never reach the handler.
+
         Parameters
         ----------
         event_type : type
             The event type to handle. One of the supported incoming event models like OfferCall, OfferRequest, etc.
+        workers : int, optional
+            Number of events of this type handled concurrently. Defaults to `MAOTO_HANDLER_WORKERS`.
+        queue_size : int, optional
+            Maximum number of queued events of this type. Defaults to `MAOTO_HANDLER_QUEUE_SIZE`.
+        priority : Priority, optional
+            Scheduling priority of this event type. Defaults to `event_priorities[event_type]`.
+            Cost and offer requests, which block a waiting marketplace, default to `Priority.URGENT`.
+        deadline : float, optional
+            Seconds after receipt by which the handler must have started. Events that
+            miss it are dropped, or handled and counted as expired when
+            `MAOTO_HANDLER_DEADLINE_POLICY` is "flag". Defaults to `event_deadlines[event_type]`.
+        quote_key : callable, optional
+            Only for OfferCallableCostRequest and OfferReferenceCostRequest. Enables the quote
+            cache: the cost response the handler sends is cached for `MAOTO_QUOTE_CACHE_TTL`
+            seconds under `quote_key(request)`, and later requests with the same key are
+            answered from the cache without calling the handler. Defaults to `quote_keys[event_type]`.
+        skill_id : uuid.UUID, optional
+            Only for OfferRequest. Route the requests for this skill to the handler.
+        solver_id : uuid.UUID, optional
+            Only for OfferRequest. Route the requests with this solver id to the handler.
+        tags : list of str, optional
+            Only for OfferRequest. Route requests for skills with any of these tags to the
+            handler, preferring the handler sharing the most tags. Skill tags are looked up
+            in `registry`, so the skill must have been registered through this agent or
+            `MAOTO_REGISTRY_MIRROR` must be enabled.
+
+            Several OfferRequest handlers can be registered this way. A request is routed by
+            `skill_id`, then `solver_id`, then `tags`, and otherwise to the handler
+            registered without any of them. All OfferRequest handlers share one queue; a
+            registration with queue options replaces it, keeping the events already queued.
+        executor : {"async", "thread", "process"}, optional
+            Where the handler runs. "async" awaits it on the event loop; "thread" runs it in a
+            pool of `MAOTO_HANDLER_THREAD_WORKERS` threads, for blocking code; "process" runs it
+            in a pool of `MAOTO_HANDLER_PROCESS_WORKERS` processes, for CPU-bound code, and
+            requires a module-level function. Only synchronous functions can run in a thread
+            or process; they cannot await the agent's methods there, and return their response
+            instead. Defaults to "async" for coroutine functions and "thread" otherwise.
+
+            Whatever the executor, a NewOfferResponse, NewOfferCallResponse or cost response
+            returned by the handler is sent with `send_response` from the event loop.
 
         Returns
         -------
@@ -102,13 +700,34 @@ class Maoto(FastAPI):
         Raises
         ------
         ValueError
-            If the provided type is not among supported event types.
+            If the provided type is not among supported event types, `quote_key` or a
+            routing key is given for an event type that does not support it, the executor
+            is unknown or cannot run the handler: a coroutine function in a thread or process,
+            or a lambda or nested function in a process.
 
         Examples
         --------
         >>> @maoto.register_handler(OfferCall)
         >>> def handle_offer_call(event):
         >>>     print("Handling OfferCall", event)
+
+        >>> @maoto.register_handler(
+        ...     OfferCallableCostRequest,
+        ...     quote_key=lambda r: (r.offercallable_id, r.intent.description, tuple(r.intent.tags)),
+        ... )
+        >>> async def quote(request):
+        ...     await maoto.send_response(NewOfferCallableCostResponse(...))
+
+        >>> @maoto.register_handler(OfferRequest, skill_id=flight_skill.id)
+        >>> async def offer_flights(request): ...
+        >>> @maoto.register_handler(OfferRequest, tags=["hotel", "travel"])
+        >>> async def offer_hotels(request): ...
+
+        >>> @maoto.register_handler(OfferCallableCostRequest, executor="process")
+        >>> def price(request):  # defined at module level
+        ...     return NewOfferCallableCostResponse(
+        ...         offercallable_id=request.offercallable_id, intent_id=request.intent.id, cost=model(request)
+        ...     )
         """
 
         def decorator(func):
@@ -117,22 +736,337 @@ class Maoto(FastAPI):
                     f"Unsupported event type: {event_type}. Supported types are: {self.supported_event_types}"
                 )
 
-            async def instant_response(input: event_type):
-                asyncio.create_task(func(input))
-
-            self.add_api_route(
-                dependencies=[Depends(self._verify_hmac)],
-                path=f"/{event_type.__name__}",
-                endpoint=instant_response,
-                summary=f"Handle {event_type.__name__} events",
-                description=self.supported_event_types[event_type],
-                methods=["POST"],
-                response_model=None,
+            if executor is None:
+                kind = "async" if inspect.iscoroutinefunction(func) else "thread"
+            elif executor in ("async", "thread", "process"):
+                kind = executor
+            else:
+                raise ValueError(
+                    f"Unsupported executor: {executor!r}. Use 'async', 'thread' or 'process'."
+                )
+            if kind != "async":
+                check_pool_handler(func, kind)
+
+            async def run(event):
+                if kind == "async":
+                    result = await func(event)
+                else:
+                    result = await self._pools.run(kind, func, event)
+                if isinstance(result, _RESPONSE_TYPES):
+                    await self.send_response(result)
+
+            handler = run
+            if event_type in COST_RESPONSE_TYPES:
+                if quote_key is not None:
+                    self.quote_keys[event_type] = quote_key
+
+                async def handler(event):
+                    key = self._quotes.key(event)
+                    token = current_quote.set(None if key is None else (event, key))
+                    try:
+                        await run(event)
+                    finally:
+                        current_quote.reset(token)
+
+            elif quote_key is not None:
+                raise ValueError(f"quote_key is only supported for cost requests, not {event_type}")
+
+            self._watchdog.watch(func, event_type.__name__)
+            if event_type is OfferRequest:
+                self._offer_router.add(run, skill_id=skill_id, solver_id=solver_id, tags=tags)
+                handler = self._offer_router.dispatch
+                if self._executor.handles(OfferRequest) and not (
+                    workers or queue_size or priority is not None or deadline is not None
+                ):
+                    return func
+            elif skill_id is not None or solver_id is not None or tags:
+                raise ValueError(
+                    f"skill_id, solver_id and tags are only supported for OfferRequest, not {event_type}"
+                )
+
+            self._executor.add(
+                event_type,
+                handler,
+                priority=priority if priority is not None else self.event_priorities[event_type],
+                deadline=deadline if deadline is not None else self.event_deadlines.get(event_type),
+                workers=workers,
+                queue_size=queue_size,
             )
+            self._add_event_route(event_type)
             return func
 
         return decorator
 
+    def _add_event_route(self, event_type: type[BaseModel]):
+        """Expose the webhook endpoint of an event type, unless it already exists."""
+        path = f"/{event_type.__name__}"
+        if path in self._handler_paths:
+            return
+        self._handler_paths.add(path)
+        self._webhook_models.add(event_type)
+        self.openapi_schema = None
+
+        async def instant_response(request: Request):
+            await self._accept(event_type, request)
+
+        self.add_api_route(
+            dependencies=[Depends(self._verify_hmac)],
+            path=path,
+            endpoint=instant_response,
+            summary=f"Handle {event_type.__name__} events",
+            description=self.supported_event_types[event_type],
+            methods=["POST"],
+            response_model=None,
+            openapi_extra={
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": f"#/components/schemas/{event_type.__name__}"}
+                        }
+                    },
+                }
+            },
+        )
+
+    def openapi(self) -> dict:
+        # Webhook routes validate the raw body themselves, so their models are added by hand.
+        if self.openapi_schema:
+            return self.openapi_schema
+        schema = super().openapi()
+        if self._webhook_models:
+            _, definitions = models_json_schema(
+                [(model, "validation") for model in self._webhook_models],
+                ref_template="#/components/schemas/{model}",
+            )
+            components = schema.setdefault("components", {}).setdefault("schemas", {})
+            components.update(definitions.get("$defs", {}))
+        return schema
+
+    def handler_stats(self) -> dict[str, dict]:
+        """
+        Return queue and execution counters of the registered handlers.
+
+        Returns
+        -------
+        dict
+            Maps each registered event type name to its worker count, queue size,
+            queue depth, in-flight, processed, failed, rejected and dropped counters.
+
+        Examples
+        --------
+        >>> maoto.handler_stats()["OfferRequest"]["queue_depth"]
+        0
+        """
+        return self._executor.stats()
+
+    def priority_stats(self) -> dict[str, dict]:
+        """
+        Return per-priority statistics of the time events waited before their handler started.
+
+        Returns
+        -------
+        dict
+            Maps each priority name to the sample count and the mean, p50, p95, p99
+            and max wait time in seconds.
+
+        Examples
+        --------
+        >>> maoto.priority_stats()["URGENT"]["p95"]
+        0.002
+        """
+        return self._executor.priority_stats()
+
+    def outbox_stats(self) -> dict:
+        """
+        Return counters of the outbox used for deferred outbound calls.
+
+        Returns
+        -------
+        dict
+            Number of queued calls and of delivered, failed and retried attempts.
+
+        Examples
+        --------
+        >>> maoto.outbox_stats()["queued"]
+        0
+        """
+        return self._outbox.stats()
+
+    def breaker_stats(self) -> dict:
+        """
+        Return the state of the circuit breakers and the retry budget of outbound calls.
+
+        Returns
+        -------
+        dict
+            Maps each upstream base URL to its breaker state ("closed", "open" or
+            "half_open"), consecutive failures, times opened and fail-fast rejections.
+            The "retries" entry holds the total retries and the remaining retry budget.
+
+        Examples
+        --------
+        >>> maoto.breaker_stats()[str(maoto._settings.url_mp)]["state"]
+        'closed'
+        """
+        return {
+            **{url: breaker.stats() for url, breaker in self._breakers.items()},
+            "retries": {"total": self._retries, **self._retry_budget.stats()},
+        }
+
+    def rate_limit_stats(self) -> dict[str, dict]:
+        """
+        Return the state of the client-side rate limiters of outbound calls.
+
+        Limits are configured in `MAOTO_RATE_LIMITS` as requests per second, keyed by
+        upstream ("mp", "pa") or by upstream and route, e.g. `{"mp": 50, "mp:NewIntent": 10}`.
+        They are lowered automatically from `Retry-After` and rate-limit response headers.
+
+        Returns
+        -------
+        dict
+            Maps each bucket key to its current rate, available tokens, number of
+            waits, total wait time in seconds and number of pauses.
+
+        Examples
+        --------
+        >>> maoto.rate_limit_stats()["mp:NewIntent"]["waits"]
+        12
+        """
+        return self._rate_limiter.stats()
+
+    def loop_lag_stats(self) -> dict:
+        """
+        Return event loop lag percentiles and the most recent stalls.
+
+        The lag is how much later than scheduled the watchdog task woke up, sampled
+        every `MAOTO_LOOP_LAG_INTERVAL` seconds. A stall is recorded whenever the loop
+        was blocked for more than `MAOTO_LOOP_LAG_THRESHOLD` seconds, with the stack
+        the loop was executing and, if it ran through a registered handler, that
+        handler and its event type.
+
+        Returns
+        -------
+        dict
+            "count", "mean", "p50", "p95", "p99" and "max" lag in seconds, the total
+            number of "stalls", and "recent_stalls" with their start time, duration,
+            handler, event type and stack.
+
+        Examples
+        --------
+        >>> stall = maoto.loop_lag_stats()["recent_stalls"][-1]
+        >>> print(stall["event_type"], stall["handler"], stall["duration"])
+        OfferCall handle_offer_call 2.31
+        """
+        return self._watchdog.stats()
+
+    def offercall_validation_stats(self) -> dict:
+        """
+        Return counters of the validation of inbound OfferCall args.
+
+        Returns
+        -------
+        dict
+            The number of "compiled" validators, and of OfferCalls found "valid",
+            "invalid", or for an OfferCallable "unknown" to the registry mirror.
+
+        Examples
+        --------
+        >>> maoto.offercall_validation_stats()["invalid"]
+        2
+        """
+        return self._params_validators.stats()
+
+    def offer_routing_stats(self) -> dict:
+        """
+        Return the size of the OfferRequest dispatch table and how requests were routed.
+
+        Returns
+        -------
+        dict
+            The number of "skills", "solvers", "tag_routes" and "indexed_tags", whether the
+            table "has_fallback", and under "routed" the number of requests routed by
+            "skill", "solver", "tags", to the "fallback", or "unrouted".
+
+        Examples
+        --------
+        >>> maoto.offer_routing_stats()["routed"]["skill"]
+        1200
+        """
+        return self._offer_router.stats()
+
+    def quote_cache_stats(self) -> dict:
+        """
+        Return hit and miss counters of the cost quote cache.
+
+        The hits, misses and number of entries are also exported on `/metrics`.
+
+        Returns
+        -------
+        dict
+            Per cost request type the "hits", "misses", "stored" quotes and "hit_rate",
+            plus the number of cached "entries" and of "evicted" ones.
+
+        Examples
+        --------
+        >>> maoto.quote_cache_stats()["OfferCallableCostRequest"]["hit_rate"]
+        0.82
+        """
+        return self._quotes.stats()
+
+    def correlation_stats(self) -> dict:
+        """
+        Return counters of the table matching inbound responses to waiting callers.
+
+        Returns
+        -------
+        dict
+            "keys" and "waiting" callers currently tracked, "buffered" responses nobody
+            waits for yet, and the totals "published", "delivered", "expired" and "evicted".
+
+        Examples
+        --------
+        >>> maoto.correlation_stats()["waiting"]
+        3
+        """
+        return self._correlations.stats()
+
+    def coalescing_stats(self) -> dict:
+        """
+        Return counters of the coalescing of identical concurrent GET requests,
+        enabled with `MAOTO_REQUEST_COALESCING`.
+
+        Returns
+        -------
+        dict
+            "requests": GET requests actually sent, "coalesced": calls that shared the
+            response of an identical request already in flight, "in_flight": requests
+            currently shared.
+
+        Examples
+        --------
+        >>> maoto.coalescing_stats()
+        {'requests': 12, 'coalesced': 40, 'in_flight': 0}
+        """
+        return {**self._coalescing, "in_flight": len(self._inflight)}
+
+    def admission_stats(self) -> dict:
+        """
+        Return the state of the adaptive admission control.
+
+        Returns
+        -------
+        dict
+            Current concurrency limit, smoothed handler latency in seconds,
+            number of in-flight events and number of rejected deliveries.
+
+        Examples
+        --------
+        >>> maoto.admission_stats()["limit"]
+        100
+        """
+        return {**self._limiter.stats(), "in_flight": self._executor.pending}
+
     @staticmethod
     def safe_urljoin(base: HttpUrl, *paths: str) -> str:
         """
@@ -157,10 +1091,18 @@ class Maoto(FastAPI):
         signature: str = Header(..., alias="Signature"),
         timestamp: str  = Header(..., alias="Timestamp"),
     ):
-        body = await request.body()
-        expected = self._make_signature(request.method, request.url.path, timestamp, body, self._settings.apikey_hashed)
+        root = self.tracer.start_span("webhook " + request.url.path.lstrip("/"))
+        request.state.trace_root = root
+        with self.tracer.span("verify_hmac", root):
+            body = await request.body()
+            expected = self._make_signature(
+                request.method, request.url.path, timestamp, body, self._settings.apikey_hashed
+            )
         if not hmac.compare_digest(expected, signature):
-            raise HTTPException(403, "Invalid signature")
+            self._hmac_failures.inc()
+            exc = HTTPException(403, "Invalid signature")
+            self.tracer.end_span(root, exc)
+            raise exc
 
     async def _request(
         self,
@@ -171,69 +1113,248 @@ class Maoto(FastAPI):
         is_list: bool = False,
         route: str | None = None,
         url: HttpUrl = None,
+        use_breaker: bool = True,
+        coalesce: bool | None = None,
     ) -> BaseModel:
-        """Send a request to another FastAPI server with a Pydantic object and return a validated response."""
+        """
+        Send a request to another FastAPI server with a Pydantic object and return a validated response.
+
+        Transport errors and 429/502/503/504 responses are retried with jittered exponential
+        backoff, honouring `Retry-After`, as long as the process-wide retry budget allows.
+        POST requests are only retried when they cannot have been processed: after errors
+        connecting to the upstream, and on 429 or on 503 with `Retry-After`.
+        Requests to an upstream whose circuit breaker is open fail fast with CircuitOpenError.
+        Every attempt first waits for the client-side rate limits of its upstream and route.
+
+        With `coalesce`, which defaults to `MAOTO_REQUEST_COALESCING`, identical concurrent
+        GET requests are coalesced: only the first is sent and every caller receives the same
+        result models, in a list of its own for list results.
+        """
         full_url = url if not route else self.safe_urljoin(url, route)
-        request_kwargs = {"headers": self._headers}
 
-        if isinstance(input, BaseModel):
-            request_kwargs["json"] = input.model_dump(mode="json")
-        elif isinstance(input, dict):
-            request_kwargs["json"] = input
+        if coalesce is None:
+            coalesce = self._settings.request_coalescing
+        if coalesce and method == "GET":
+            params_key = json.dumps(params or {}, sort_keys=True, default=str)
+            key = (str(full_url), params_key, result_type, is_list)
+            task = self._inflight.get(key)
+            if task is None:
+                self._coalescing["requests"] += 1
+                task = asyncio.ensure_future(
+                    self._request(
+                        method,
+                        params=params,
+                        result_type=result_type,
+                        is_list=is_list,
+                        route=route,
+                        url=url,
+                        use_breaker=use_breaker,
+                        coalesce=False,
+                    )
+                )
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._inflight.pop(key, None))
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            else:
+                self._coalescing["coalesced"] += 1
+            result = await asyncio.shield(task)
+            return list(result) if isinstance(result, list) else result
+        upstream = self._upstream(url)
+        route_label = (route or "").split("?")[0]
+        with self.tracer.span(f"{method} {route_label}", upstream=upstream) as span:
+            if span is not None:
+                span.attributes.update(correlation_attributes(input))
+            client = self._get_client(url)
+            request_kwargs = {}
+
+            if isinstance(input, (BaseModel, dict)):
+                request_kwargs["content"] = dumps(input, self._settings.json_backend)
+                request_kwargs["headers"] = {"Content-Type": "application/json"}
+
+            if isinstance(params, BaseModel):
+                params = params.model_dump(mode="json")
+            elif isinstance(params, dict):
+                request_kwargs["params"] = params
+
+            breaker = self._breakers.get(str(url)) if use_breaker else None
+            if breaker is not None:
+                await breaker.before_call()
+            self._retry_budget.record_request()
+            idempotent = method != "POST"
+
+            attempt = 0
+            while True:
+                attempt += 1
+                await self._rate_limiter.acquire(upstream, route)
+                started = time.monotonic()
+                try:
+                    response = await client.request(method, str(full_url), **request_kwargs)
+                except httpx.TransportError as exc:
+                    self._outbound_duration.observe(
+                        time.monotonic() - started, upstream, route_label
+                    )
+                    self._outbound_responses.inc(upstream, route_label, "error")
+                    if breaker is not None:
+                        breaker.record_failure()
+                    retryable = idempotent or isinstance(exc, CONNECT_ERRORS)
+                    if not (retryable and self._may_retry(attempt)):
+                        raise
+                    delay = self._retry_policy.backoff(attempt)
+                else:
+                    self._outbound_duration.observe(
+                        time.monotonic() - started, upstream, route_label
+                    )
+                    self._outbound_responses.inc(upstream, route_label, str(response.status_code))
+                    self._rate_limiter.observe(upstream, route, response)
+                    if breaker is not None:
+                        if response.status_code >= 500:
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                    if response.is_success:
+                        break
+                    delay = self._retry_policy.backoff(attempt)
+                    retry_after = parse_retry_after(response)
+                    if retry_after is not None:
+                        delay = max(delay, retry_after)
+                    if (
+                        not is_retryable(response, idempotent)
+                        or delay > self._retry_policy.max_delay
+                        or not self._may_retry(attempt)
+                    ):
+                        self._raise_for_status(response)
+
+                self._retries += 1
+                self._outbound_retries.inc(upstream, route_label)
+                await asyncio.sleep(delay)
+                if breaker is not None:
+                    await breaker.before_call()
+
+            if span is not None:
+                span.attributes.update(
+                    {"http.status_code": response.status_code, "attempts": attempt}
+                )
+            if result_type is None:
+                return None
+
+            if result_type is str:
+                return response.text
 
-        if isinstance(params, BaseModel):
-            params = params.model_dump(mode="json")
-        elif isinstance(params, dict):
-            request_kwargs["params"] = params
+            if result_type is bool:
+                return loads(response.content, self._settings.json_backend)
+            if is_list:
+                return list_adapter(result_type).validate_json(response.content)
+            return result_type.model_validate_json(response.content)
 
-        MAX_RETRIES = 3
-        RETRY_DELAY = 1  # in seconds
+    async def _stream_list(
+        self,
+        method: Literal["GET"],
+        result_type: type[BaseModel],
+        route: str,
+        url: HttpUrl,
+    ) -> AsyncIterator[BaseModel]:
+        """
+        Stream a JSON array response and yield its items validated one at a time.
 
-        for attempt in range(1, MAX_RETRIES + 1):
+        Only the item currently being received is buffered. Streams are not retried,
+        but respect the circuit breaker and rate limits of the upstream.
+        """
+        upstream = self._upstream(url)
+        breaker = self._breakers.get(str(url))
+        if breaker is not None:
+            await breaker.before_call()
+        await self._rate_limiter.acquire(upstream, route)
+
+        client = self._get_client(url)
+        try:
+            async with client.stream(method, self.safe_urljoin(url, route)) as response:
+                self._outbound_responses.inc(upstream, route, str(response.status_code))
+                self._rate_limiter.observe(upstream, route, response)
+                if breaker is not None:
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if not response.is_success:
+                    await response.aread()
+                    self._raise_for_status(response)
+
+                splitter = JsonArraySplitter()
+                async for chunk in response.aiter_bytes():
+                    for item in splitter.feed(chunk):
+                        yield result_type.model_validate_json(item)
+                if not splitter.finished:
+                    raise ValueError(f"Incomplete JSON array in response from {route}")
+        except httpx.TransportError:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+
+    def _upstream(self, url: HttpUrl | str) -> str:
+        return "pa" if str(url) == str(self._settings.url_pa) else "mp"
+
+    def _may_retry(self, attempt: int) -> bool:
+        return attempt < self._retry_policy.max_attempts and self._retry_budget.try_spend()
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response):
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            # Original HTTPX message, e.g. "429 Too Many Requests…"
+            orig = str(exc)
+
+            # Safely attempt to parse JSON detail, otherwise fall back to text
+            detail = None
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.request(method, str(full_url), **request_kwargs)
-                    response.raise_for_status()
-                break  # success
-            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as conn_exc:
-                if attempt == MAX_RETRIES:
-                    raise
-                await asyncio.sleep(RETRY_DELAY)
-            except httpx.HTTPStatusError as exc:
-                # Original HTTPX message, e.g. "429 Too Many Requests…"
-                orig = str(exc)
-
-                # Safely attempt to parse JSON detail, otherwise fall back to text
-                detail = None
-                try:
-                    body = exc.response.json()
-                    # if body is a dict, try to pull out a "detail" field
-                    if isinstance(body, dict):
-                        detail = body.get("detail")
-                except (ValueError, TypeError):
-                    # not JSON, or not a dict
-                    pass
-
-                if not detail:
-                    detail = exc.response.text or "<no response body>"
-
-                msg = f"{orig}\nDetail: {detail}"
-                raise httpx.HTTPStatusError(
-                    msg, request=exc.request, response=exc.response
-                ) from exc
-
-        if result_type is None:
-            return None
-
-        if result_type is str:
-            return response.text
-
-        data = response.json()
-        if result_type is bool:
-            return data
-        if is_list:
-            return [result_type.model_validate(item) for item in data]
-        return result_type.model_validate(data)
+                body = exc.response.json()
+                # if body is a dict, try to pull out a "detail" field
+                if isinstance(body, dict):
+                    detail = body.get("detail")
+            except (ValueError, TypeError):
+                # not JSON, or not a dict
+                pass
+
+            if not detail:
+                detail = exc.response.text or "<no response body>"
+
+            msg = f"{orig}\nDetail: {detail}"
+            raise httpx.HTTPStatusError(msg, request=exc.request, response=exc.response) from exc
+
+    async def _deliver(self, call: dict):
+        return await self._request(
+            method=call["method"],
+            input=call["input"],
+            result_type=bool if call["result_type"] == "bool" else None,
+            route=call["route"],
+            url=self._settings.url_pa if call["upstream"] == "pa" else self._settings.url_mp,
+        )
+
+    async def _send(
+        self,
+        deferred: bool | None,
+        method: Literal["POST"],
+        input: BaseModel | dict,
+        route: str,
+        url: HttpUrl,
+        result_type: type[bool] | None = None,
+    ):
+        """Send a call now, or queue it in the outbox when deferred."""
+        if deferred is None:
+            deferred = self._settings.outbox_enabled
+        if not deferred:
+            return await self._request(
+                method=method, input=input, result_type=result_type, route=route, url=url
+            )
+        return await self._outbox.submit(
+            {
+                "method": method,
+                "input": input.model_dump(mode="json") if isinstance(input, BaseModel) else input,
+                "result_type": "bool" if result_type is bool else None,
+                "route": route,
+                "upstream": self._upstream(url),
+            }
+        )
 
     async def get_own_apikey(self) -> ApiKey:
         """
@@ -273,7 +1394,11 @@ class Maoto(FastAPI):
         >>> print("Marketplace is up" if is_up else "Marketplace is down")
         """
         return await self._request(
-            result_type=str, route="healthz", url=self._settings.url_mp, method="GET"
+            result_type=str,
+            route="healthz",
+            url=self._settings.url_mp,
+            method="GET",
+            use_breaker=False,
         )
 
     async def health_assistant(self) -> bool:
@@ -291,10 +1416,14 @@ class Maoto(FastAPI):
         >>> print("Assistant is running" if is_up else "Assistant is down")
         """
         return await self._request(
-            result_type=str, route="healthz", url=self._settings.url_pa, method="GET"
+            result_type=str,
+            route="healthz",
+            url=self._settings.url_pa,
+            method="GET",
+            use_breaker=False,
         )
 
-    async def send_intent(self, new_intent: NewIntent) -> None:
+    async def send_intent(self, new_intent: NewIntent) -> Intent:
         """
         Send an intent to the Marketplace for resolution.
 
@@ -316,6 +1445,150 @@ class Maoto(FastAPI):
             method="POST",
         )
 
+    async def send_intent_and_wait(
+        self, new_intent: NewIntent, timeout: float | None = None
+    ) -> IntentResponse:
+        """
+        Send an intent to the Marketplace and wait for its IntentResponse.
+
+        The response is matched by `intent_id` from the inbound IntentResponse webhook.
+        A handler registered for IntentResponse still receives every response; without
+        one, the webhook endpoint is added on first use.
+
+        Parameters
+        ----------
+        new_intent : NewIntent
+            The intent object to create and send.
+        timeout : float, optional
+            Seconds to wait for the response. Defaults to `MAOTO_CORRELATION_TTL`.
+
+        Returns
+        -------
+        IntentResponse
+            The first response received for the intent.
+
+        Raises
+        ------
+        TimeoutError
+            If no response arrived within `timeout` seconds.
+
+        Examples
+        --------
+        >>> response = await maoto.send_intent_and_wait(intent, timeout=30)
+        >>> print(response.description)
+        """
+        self._add_event_route(IntentResponse)
+        intent = await self.send_intent(new_intent)
+        timeout = timeout if timeout is not None else self._settings.correlation_ttl
+        stream = self._correlations.stream((IntentResponse, intent.id), timeout)
+        async with aclosing(stream):
+            async for response in stream:
+                return response
+        raise TimeoutError(f"No IntentResponse for intent {intent.id} within {timeout} seconds")
+
+    async def offercall_responses(
+        self, offercall_id: uuid.UUID, timeout: float | None = None
+    ) -> AsyncIterator[OfferCallResponse]:
+        """
+        Stream the OfferCallResponses received for an OfferCall.
+
+        Responses are matched by `offercall_id` from the inbound OfferCallResponse
+        webhooks, including those that arrived shortly before the stream was opened.
+        A handler registered for OfferCallResponse still receives every response;
+        without one, the webhook endpoint is added on first use.
+
+        Parameters
+        ----------
+        offercall_id : uuid.UUID
+            ID of the OfferCall, as returned by `send_newoffercall`.
+        timeout : float, optional
+            The stream ends once no response arrived for this many seconds.
+            Defaults to `MAOTO_CORRELATION_TTL`.
+
+        Yields
+        ------
+        OfferCallResponse
+            Each response for the OfferCall, in order of arrival.
+
+        Examples
+        --------
+        >>> offercall = await maoto.send_newoffercall(new_call)
+        >>> async for response in maoto.offercall_responses(offercall.id, timeout=120):
+        ...     print(response.description)
+        """
+        self._add_event_route(OfferCallResponse)
+        timeout = timeout if timeout is not None else self._settings.correlation_ttl
+        stream = self._correlations.stream((OfferCallResponse, offercall_id), timeout)
+        async with aclosing(stream):
+            async for response in stream:
+                yield response
+
+    async def send_intents(
+        self,
+        new_intents: Iterable[NewIntent] | AsyncIterable[NewIntent],
+        concurrency: int | None = None,
+    ) -> AsyncIterator[tuple[NewIntent, Intent | Exception]]:
+        """
+        Send many intents to the Marketplace with bounded concurrency.
+
+        Intents are pulled from `new_intents` only as slots free up, so at most
+        `concurrency` are held in memory and in flight at any time; the input may be
+        a lazy (async) generator of any length. Every call shares the connection pool,
+        retries and rate limits of `send_intent`. Results are yielded in completion
+        order, not input order. Leaving the loop early cancels the calls in flight.
+
+        Parameters
+        ----------
+        new_intents : iterable or async iterable of NewIntent
+            The intents to send.
+        concurrency : int, optional
+            Maximum number of intents in flight. Defaults to `MAOTO_SEND_INTENTS_CONCURRENCY`.
+
+        Yields
+        ------
+        tuple of (NewIntent, Intent or Exception)
+            Each input intent with the created Intent, or the exception its call raised.
+
+        Examples
+        --------
+        >>> async for new_intent, result in maoto.send_intents(intents, concurrency=32):
+        ...     if isinstance(result, Exception):
+        ...         print("failed", new_intent.description, result)
+        """
+        limit = max(1, concurrency or self._settings.send_intents_concurrency)
+        if isinstance(new_intents, AsyncIterable):
+            source = aiter(new_intents)
+        else:
+            source = None
+            sync_source = iter(new_intents)
+        pending: dict[asyncio.Task, NewIntent] = {}
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < limit:
+                    try:
+                        new_intent = await anext(source) if source else next(sync_source)
+                    except (StopAsyncIteration, StopIteration):
+                        exhausted = True
+                        break
+                    pending[asyncio.ensure_future(self.send_intent(new_intent))] = new_intent
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    new_intent = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as exc:
+                        result = exc
+                    yield new_intent, result
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
     async def unregister(
         self,
         obj: Skill | OfferCallable | OfferReference | None = None,
@@ -374,6 +1647,7 @@ class Maoto(FastAPI):
             url=self._settings.url_mp,
             method="POST",
         )
+        self.registry.remove(obj_type, id=obj.id if obj else id, solver_id=solver_id)
 
     async def send_response(
         self,
@@ -381,7 +1655,8 @@ class Maoto(FastAPI):
         | NewOfferCallResponse
         | NewOfferCallableCostResponse
         | NewOfferReferenceCostResponse,
-    ):
+        deferred: bool | None = None,
+    ) -> OutboxTicket | None:
         """
         Send a response object to the Marketplace to complete a request or update its status.
 
@@ -405,11 +1680,14 @@ class Maoto(FastAPI):
             - **NewOfferReferenceCostResponse**
             Sent in response to an OfferReferenceCostRequest.
             Provides the cost and/or URL for a reference offer.
+        deferred : bool, optional
+            Queue the response in the outbox and return immediately instead of
+            waiting for the Marketplace. Defaults to `MAOTO_OUTBOX_ENABLED`.
 
         Returns
         -------
-        bool
-            True if the response was successfully sent.
+        OutboxTicket or None
+            A ticket that can be awaited for delivery when deferred, otherwise None.
 
         Raises
         ------
@@ -420,21 +1698,16 @@ class Maoto(FastAPI):
         --------
         >>> response = NewOfferResponse(...)  # Fill with valid response data
         >>> await maoto.send_response(response)
+        >>> ticket = await maoto.send_response(response, deferred=True)
         """
-        if not isinstance(
-            obj,
-            (
-                NewOfferResponse,
-                NewOfferCallResponse,
-                NewOfferCallableCostResponse,
-                NewOfferReferenceCostResponse,
-            ),
-        ):
+        if not isinstance(obj, _RESPONSE_TYPES):
             raise ValueError(
                 "Input must be one of: NewOfferResponse, NewOfferCallResponse, NewOfferCallableCostResponse, NewOfferReferenceCostResponse."
             )
 
-        await self._request(
+        self._quotes.capture(obj)
+        return await self._send(
+            deferred,
             input=obj,
             route=f"{type(obj).__name__}",
             url=self._settings.url_mp,
@@ -488,13 +1761,17 @@ class Maoto(FastAPI):
                 "Unsupported type. Must be one of: NewSkill, NewOfferCallable, NewOfferReference."
             )
 
-        return await self._request(
+        registered = await self._request(
             input=obj,
             result_type=result_type,
             route=f"register{type(obj).__name__}",
             url=self._settings.url_mp,
             method="POST",
         )
+        self.registry.put(registered)
+        if isinstance(registered, OfferCallable):
+            self._params_validators.put(registered)
+        return registered
 
     async def get_registered(
         self, type_ref: type[Skill | OfferCallable | OfferReference]
@@ -540,9 +1817,154 @@ class Maoto(FastAPI):
             method="GET",
         )
 
+    async def iter_registered(
+        self, type_ref: type[Skill | OfferCallable | OfferReference]
+    ) -> AsyncIterator[Skill | OfferCallable | OfferReference]:
+        """
+        Stream registered objects of a given type from the Marketplace.
+
+        Unlike `get_registered`, objects are parsed from the response as it arrives and
+        yielded one at a time, so memory use does not grow with the size of the catalogue.
+        To release the connection as soon as you stop early, iterate inside
+        `contextlib.aclosing`.
+
+        Parameters
+        ----------
+        type_ref : type
+            One of the following types:
+
+            - **Skill**
+            - **OfferCallable**
+            - **OfferReference**
+
+        Yields
+        ------
+        Skill or OfferCallable or OfferReference
+            The registered objects of the given type.
+
+        Raises
+        ------
+        ValueError
+            If the provided type is not supported.
+
+        Examples
+        --------
+        >>> async for offer in maoto.iter_registered(OfferCallable):
+        >>>     print(offer.id)
+
+        >>> async with aclosing(maoto.iter_registered(Skill)) as skills:
+        ...     first = await anext(skills)
+        """
+        if type_ref not in {Skill, OfferCallable, OfferReference}:
+            raise ValueError(
+                "Unsupported type. Must be one of: Skill, OfferCallable, OfferReference."
+            )
+
+        stream = self._stream_list(
+            result_type=type_ref,
+            route=f"get{type_ref.__name__}s",
+            url=self._settings.url_mp,
+            method="GET",
+        )
+        async with aclosing(stream):
+            async for obj in stream:
+                yield obj
+
+    async def sync_registry(
+        self,
+        desired: Sequence[NewSkill | NewOfferCallable | NewOfferReference],
+        prune: bool = True,
+        concurrency: int | None = None,
+    ) -> RegistrySyncReport:
+        """
+        Bring the registered Skills, OfferCallables and OfferReferences in line with a desired state.
+
+        The current registrations are fetched once and matched to the desired objects by
+        type, `solver_id` and description. Missing objects are registered, objects whose
+        other fields differ are replaced, and with `prune` all registrations that are not
+        desired are removed. The required calls run concurrently; a replaced object is only
+        unregistered once its replacement has been registered.
+
+        Parameters
+        ----------
+        desired : sequence of NewSkill, NewOfferCallable or NewOfferReference
+            Every object the agent should have registered.
+        prune : bool, optional
+            Unregister registered objects that are not desired. Defaults to True.
+        concurrency : int, optional
+            Maximum number of concurrent register/unregister calls.
+            Defaults to `MAOTO_REGISTRY_SYNC_CONCURRENCY`.
+
+        Returns
+        -------
+        RegistrySyncReport
+            The objects registered and unregistered, the number left unchanged,
+            the errors of failed calls and the duration in seconds.
+
+        Raises
+        ------
+        ValueError
+            If a desired object is not a NewSkill, NewOfferCallable or NewOfferReference.
+
+        Examples
+        --------
+        >>> report = await maoto.sync_registry([NewSkill(...), NewOfferCallable(...)])
+        >>> print(len(report.registered), len(report.unregistered), report.duration)
+        """
+        started = time.monotonic()
+        for obj in desired:
+            if type(obj) not in REGISTERED_TYPES:
+                raise ValueError(
+                    "Input must be one of: NewSkill, NewOfferCallable, NewOfferReference."
+                )
+
+        fetched = await asyncio.gather(
+            *(self.get_registered(type_ref) for type_ref in REGISTERED_TYPES.values())
+        )
+        current = [obj for objs in fetched for obj in objs]
+        to_register, to_replace, to_unregister, unchanged = plan_sync(current, desired, prune)
+
+        report = RegistrySyncReport(unchanged=unchanged)
+        semaphore = asyncio.Semaphore(concurrency or self._settings.registry_sync_concurrency)
+
+        async def register(obj) -> bool:
+            async with semaphore:
+                try:
+                    report.registered.append(await self.register(obj))
+                except Exception as exc:
+                    report.errors.append(
+                        f"register {type(obj).__name__} {obj.description!r}: {exc}"
+                    )
+                    return False
+            return True
+
+        async def unregister(obj):
+            async with semaphore:
+                try:
+                    await self.unregister(obj)
+                    report.unregistered.append(obj)
+                except Exception as exc:
+                    report.errors.append(f"unregister {type(obj).__name__} {obj.id}: {exc}")
+
+        async def replace(obj, registered):
+            # The old registration stays live until its replacement is in place.
+            if await register(obj):
+                await unregister(registered)
+
+        await asyncio.gather(
+            *(register(obj) for obj in to_register),
+            *(replace(obj, registered) for obj, registered in to_replace),
+            *(unregister(obj) for obj in to_unregister),
+        )
+        report.duration = time.monotonic() - started
+        return report
+
     async def refund_offercall(
-        self, offercall: OfferCall | None = None, id: uuid.UUID | None = None
-    ) -> bool:
+        self,
+        offercall: OfferCall | None = None,
+        id: uuid.UUID | None = None,
+        deferred: bool | None = None,
+    ) -> bool | OutboxTicket:
         """
         Refund an OfferCall due to an error, cancellation, or other issues.
 
@@ -552,11 +1974,13 @@ class Maoto(FastAPI):
             The OfferCall object to refund.
         id : uuid.UUID, optional
             The ID of the OfferCall.
+        deferred : bool, optional
+            Queue the refund in the outbox and return immediately. Defaults to `MAOTO_OUTBOX_ENABLED`.
 
         Returns
         -------
-        bool
-            True if the refund was successful.
+        bool or OutboxTicket
+            True if the refund was successful, or a ticket resolving to it when deferred.
 
         Raises
         ------
@@ -572,7 +1996,8 @@ class Maoto(FastAPI):
         if not offercallid:
             raise ValueError("Either offercall or id must be provided.")
 
-        return await self._request(
+        return await self._send(
+            deferred,
             input={"id": str(offercallid)},
             result_type=bool,
             route="refundOfferCall",
@@ -592,7 +2017,7 @@ class Maoto(FastAPI):
         Returns
         -------
         OfferCall
-            The created OfferCall object.
+            The created OfferCall object. Its responses can be awaited with `offercall_responses`.
 
         Raises
         ------
@@ -608,6 +2033,7 @@ class Maoto(FastAPI):
         if not isinstance(new_offercall, NewOfferCall):
             raise ValueError("Input must be a NewOfferCall object.")
 
+        self._add_event_route(OfferCallResponse)
         return await self._request(
             input=new_offercall,
             result_type=OfferCall,
@@ -653,8 +2079,10 @@ class Maoto(FastAPI):
         )
 
     async def send_to_assistant(
-        self, obj: PALocationResponse | PAUserResponse | PANewConversation | PASupportRequest
-    ):
+        self,
+        obj: PALocationResponse | PAUserResponse | PANewConversation | PASupportRequest,
+        deferred: bool | None = None,
+    ) -> OutboxTicket | None:
         """
         Send a supported object to the Assistant service via GraphQL.
 
@@ -674,6 +2102,13 @@ class Maoto(FastAPI):
 
             - **PASupportRequest**
             Sends a support-related request.
+        deferred : bool, optional
+            Queue the object in the outbox and return immediately. Defaults to `MAOTO_OUTBOX_ENABLED`.
+
+        Returns
+        -------
+        OutboxTicket or None
+            A ticket that can be awaited for delivery when deferred, otherwise None.
 
         Raises
         ------
@@ -692,7 +2127,8 @@ class Maoto(FastAPI):
                 "Input must be one of: PALocationResponse, PAUserResponse, PANewConversation, PASupportRequest."
             )
 
-        await self._request(
+        return await self._send(
+            deferred,
             input=obj,
             route=f"{type(obj).__name__}",
             url=self._settings.url_pa,
@@ -722,24 +2158,59 @@ class Maoto(FastAPI):
             method="GET",
         )
 
-    async def create_refcode(self, new_refcode: NewRefCode):
+    async def iter_refcodes(self) -> AsyncIterator[RefCode]:
+        """
+        Stream all reference codes associated with this agent.
+
+        Unlike `get_refcodes`, reference codes are parsed from the response as it arrives
+        and yielded one at a time, so memory use stays bounded. To release the connection
+        as soon as you stop early, iterate inside `contextlib.aclosing`.
+
+        Yields
+        ------
+        RefCode
+            The reference codes.
+
+        Examples
+        --------
+        >>> async for code in maoto.iter_refcodes():
+        >>>     print(code.value)
+        """
+        stream = self._stream_list(
+            result_type=RefCode,
+            route="RefCodes",
+            url=self._settings.url_pa,
+            method="GET",
+        )
+        async with aclosing(stream):
+            async for refcode in stream:
+                yield refcode
+
+    async def create_refcode(self, new_refcode: NewRefCode) -> NewRefCode:
         """
         Creates a new reference code to the assistant.
         Parameters
         ----------
         new_refcode :
             The reference code to add.
+
+        Returns
+        -------
+        NewRefCode
+            The reference code as stored by the assistant.
         """
         if not isinstance(new_refcode, NewRefCode):
             raise ValueError("Input must be a NewRefCode object.")
 
-        await self._request(
+        created = await self._request(
             input=new_refcode,
             result_type=NewRefCode,
             route="NewRefCode",
             url=self._settings.url_pa,
             method="POST",
         )
+        self.registry.put(created)
+        return created
 
     async def delete_refcode(self, value: str | None = None, offercallable_id: UUID | None = None):
         """
@@ -759,4 +2230,5 @@ class Maoto(FastAPI):
             route="RefCode",
             url=self._settings.url_pa,
             method="DELETE",
-        )
\ No newline at end of file
+        )
+        self.registry.remove_refcode(value=value, offercallable_id=offercallable_id)
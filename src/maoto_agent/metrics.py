@@ -0,0 +1,159 @@
+import bisect
+import math
+from typing import Callable, Iterable
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Monotonic counter, one value per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds, one series per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.bounds = tuple(sorted(buckets))
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.bounds) + 1), 0.0]
+        series[0][bisect.bisect_left(self.bounds, value)] += 1
+        series[1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.bounds, math.inf), counts):
+                cumulative += count
+                extra = f'le="{_number(float(bound))}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, extra)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class Gauge:
+    """
+    Metric read from a callback at collection time, returning a value per label combination.
+
+    ``kind`` may be "counter" for totals kept elsewhere, e.g. by another thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], dict[tuple, float]],
+        labels: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.collect().items():
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text exposition format.
+
+    Recording is a dictionary update and, for histograms, a bisect over the
+    bucket bounds, so it is cheap enough for every request. Gauges are
+    computed only when the metrics are collected.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], dict[tuple, float]],
+        labels: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ) -> Gauge:
+        return self._add(Gauge(name, help, collect, labels, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,99 @@
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from loguru import logger
+
+from .app_types import OfferRequest
+
+Handler = Callable[[OfferRequest], Awaitable[None]]
+
+
+class OfferRouter:
+    """
+    Dispatch table routing OfferRequests to per-skill handlers.
+
+    A request goes to the handler registered for its ``skill_id``, else for its
+    ``solver_id``, else to the tag route sharing the most tags with the skill,
+    else to the fallback handler. Skill and solver lookups are dictionary reads.
+    Tag routes are found through an inverted index from tag to routes, so a
+    request only looks at the routes that share at least one tag with its skill.
+    ``skill_tags`` returns the tags of a skill id, or None if the skill is unknown.
+    """
+
+    def __init__(self, skill_tags: Callable[[UUID], list[str] | None]):
+        self.skill_tags = skill_tags
+        self.by_skill: dict[UUID, Handler] = {}
+        self.by_solver: dict[UUID, Handler] = {}
+        self.fallback: Handler | None = None
+        self._tag_routes: list[Handler] = []
+        self._tag_index: dict[str, list[int]] = {}
+        self.routed = {"skill": 0, "solver": 0, "tags": 0, "fallback": 0, "unrouted": 0}
+
+    def add(
+        self,
+        handler: Handler,
+        skill_id: UUID | None = None,
+        solver_id: UUID | None = None,
+        tags: list[str] | None = None,
+    ):
+        if skill_id is not None:
+            self.by_skill[skill_id] = handler
+        if solver_id is not None:
+            self.by_solver[solver_id] = handler
+        if tags:
+            route = len(self._tag_routes)
+            self._tag_routes.append(handler)
+            for tag in set(tags):
+                self._tag_index.setdefault(tag, []).append(route)
+        if skill_id is None and solver_id is None and not tags:
+            self.fallback = handler
+
+    def match_tags(self, tags: list[str]) -> Handler | None:
+        """Return the tag route sharing the most tags, the earliest registered on ties."""
+        scores: dict[int, int] = {}
+        for tag in set(tags):
+            for route in self._tag_index.get(tag, ()):
+                scores[route] = scores.get(route, 0) + 1
+        if not scores:
+            return None
+        route = min(scores, key=lambda route: (-scores[route], route))
+        return self._tag_routes[route]
+
+    def resolve(self, request: OfferRequest) -> Handler | None:
+        handler = self.by_skill.get(request.skill_id)
+        if handler is not None:
+            self.routed["skill"] += 1
+            return handler
+        if request.solver_id is not None:
+            handler = self.by_solver.get(request.solver_id)
+            if handler is not None:
+                self.routed["solver"] += 1
+                return handler
+        if self._tag_index:
+            tags = self.skill_tags(request.skill_id)
+            handler = self.match_tags(tags) if tags else None
+            if handler is not None:
+                self.routed["tags"] += 1
+                return handler
+        if self.fallback is not None:
+            self.routed["fallback"] += 1
+            return self.fallback
+        self.routed["unrouted"] += 1
+        return None
+
+    async def dispatch(self, request: OfferRequest):
+        handler = self.resolve(request)
+        if handler is None:
+            logger.warning(f"No OfferRequest handler matches skill {request.skill_id}")
+            return
+        await handler(request)
+
+    def stats(self) -> dict:
+        return {
+            "skills": len(self.by_skill),
+            "solvers": len(self.by_solver),
+            "tag_routes": len(self._tag_routes),
+            "indexed_tags": len(self._tag_index),
+            "has_fallback": self.fallback is not None,
+            "routed": dict(self.routed),
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import uuid
+from typing import Awaitable, Callable
+
+import httpx
+from loguru import logger
+
+from .durable_log import DurableLog
+from .retry import CONNECT_ERRORS, CircuitOpenError, is_retryable
+
+
+class OutboxTicket:
+    """
+    Handle to an outbound call queued in the outbox.
+
+    Await it to get the result of the call once it was delivered, or the
+    error that made the outbox give up on it.
+    """
+
+    def __init__(self, id: str, future: asyncio.Future):
+        self.id = id
+        self.future = future
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def __await__(self):
+        return self.future.__await__()
+
+    def __repr__(self) -> str:
+        return f"OutboxTicket(id={self.id!r}, done={self.done()})"
+
+
+class Outbox:
+    """
+    Queue of outbound calls delivered by background senders.
+
+    Calls are JSON-serialisable dicts handed to ``deliver`` by ``concurrency``
+    sender tasks. Calls that cannot have been processed are retried with
+    exponential backoff until they succeed: connection errors, open circuit
+    breakers, 429, and 503 with ``Retry-After``. Other errors fail the call,
+    since resending a call the server may have processed could duplicate it.
+    With a DurableLog, calls are persisted before ``submit`` returns and calls
+    left over from a previous run are resent on ``start``.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[dict], Awaitable],
+        concurrency: int,
+        retry_delay: float,
+        max_retry_delay: float,
+        log: DurableLog | None = None,
+    ):
+        self._deliver = deliver
+        self.concurrency = concurrency
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._log = log
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._futures: dict[str, asyncio.Future] = {}
+        self._senders: set[asyncio.Task] = set()
+        self._started = False
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+
+    async def start(self):
+        if self._started:
+            return
+        self._started = True
+        if self._log is not None:
+            await self._log.open()
+            for id, _, payload in await self._log.unfinished():
+                self._queue.put_nowait((id, json.loads(payload)))
+        for _ in range(self.concurrency):
+            task = asyncio.create_task(self._sender(), name="maoto-outbox-sender")
+            self._senders.add(task)
+            task.add_done_callback(self._senders.discard)
+
+    async def stop(self, timeout: float):
+        if not self._started:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._queue.qsize()} outbound calls unsent at shutdown")
+        senders = list(self._senders)
+        for task in senders:
+            task.cancel()
+        await asyncio.gather(*senders, return_exceptions=True)
+        if self._log is not None:
+            await self._log.close()
+        self._started = False
+
+    async def submit(self, call: dict) -> OutboxTicket:
+        await self.start()
+        if self._log is not None:
+            id = await self._log.put(call["route"], json.dumps(call).encode())
+        else:
+            id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._futures[id] = future
+        self._queue.put_nowait((id, call))
+        return OutboxTicket(id, future)
+
+    async def _sender(self):
+        while True:
+            id, call = await self._queue.get()
+            future = self._futures.pop(id, None)
+            try:
+                result = await self._deliver_with_retry(call)
+                self.delivered += 1
+                if future is not None and not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if future is not None:
+                    self._futures[id] = future
+                id = None
+                raise
+            except Exception as exc:
+                self.failed += 1
+                logger.error(f"Giving up on outbound call to {call['route']}: {exc}")
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            finally:
+                if id is not None and self._log is not None:
+                    self._log.done(id)
+                self._queue.task_done()
+
+    async def _deliver_with_retry(self, call: dict):
+        delay = self.retry_delay
+        while True:
+            try:
+                return await self._deliver(call)
+            except httpx.HTTPStatusError as exc:
+                if not is_retryable(exc.response, idempotent=False):
+                    raise
+            except (*CONNECT_ERRORS, CircuitOpenError):
+                pass
+            self.retries += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
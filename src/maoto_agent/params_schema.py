@@ -0,0 +1,191 @@
+from typing import Any, Callable
+from uuid import UUID
+
+from .app_types import OfferCall, OfferCallable
+
+Validator = Callable[[Any, tuple], list[dict]]
+
+_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+
+def _error(loc: tuple, msg: str, kind: str) -> dict:
+    return {"type": kind, "loc": loc, "msg": msg}
+
+
+def _compile(schema: Any) -> Validator:
+    if isinstance(schema, str):
+        schema = {"type": schema} if schema in _TYPES else {}
+    if not isinstance(schema, dict):
+        return lambda value, loc: []
+
+    checks: list[Validator] = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        allowed = tuple(t for name in names for t in _TYPES.get(name, (object,)))
+        strict_bool = "boolean" not in names
+
+        def check_type(value, loc):
+            if not isinstance(value, allowed) or (strict_bool and isinstance(value, bool)):
+                return [_error(loc, f"Input should be of type {' or '.join(names)}", "type_error")]
+            return []
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        options = list(schema["enum"])
+        checks.append(
+            lambda value, loc: (
+                []
+                if value in options
+                else [_error(loc, f"Input should be one of {options!r}", "enum")]
+            )
+        )
+
+    for keyword, compare, msg in (
+        ("minimum", lambda value, bound: value >= bound, "greater than or equal to"),
+        ("maximum", lambda value, bound: value <= bound, "less than or equal to"),
+    ):
+        if keyword in schema:
+            bound = schema[keyword]
+
+            def check_bound(value, loc, bound=bound, compare=compare, msg=msg):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if not compare(value, bound):
+                        return [_error(loc, f"Input should be {msg} {bound}", "value_error")]
+                return []
+
+            checks.append(check_bound)
+
+    for keyword, compare, msg in (
+        ("minLength", lambda value, bound: len(value) >= bound, "at least"),
+        ("maxLength", lambda value, bound: len(value) <= bound, "at most"),
+    ):
+        if keyword in schema:
+            bound = schema[keyword]
+
+            def check_length(value, loc, bound=bound, compare=compare, msg=msg):
+                if isinstance(value, str) and not compare(value, bound):
+                    return [
+                        _error(loc, f"String should have {msg} {bound} characters", "value_error")
+                    ]
+                return []
+
+            checks.append(check_length)
+
+    if "items" in schema:
+        item = _compile(schema["items"])
+
+        def check_items(value, loc):
+            if not isinstance(value, list):
+                return []
+            return [
+                error
+                for index, element in enumerate(value)
+                for error in item(element, (*loc, index))
+            ]
+
+        checks.append(check_items)
+
+    if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+        properties = {
+            name: _compile(prop) for name, prop in (schema.get("properties") or {}).items()
+        }
+        required = list(schema.get("required") or ())
+        additional = schema.get("additionalProperties", True)
+
+        def check_object(value, loc):
+            if not isinstance(value, dict):
+                return []
+            errors = [
+                _error((*loc, name), "Field required", "missing")
+                for name in required
+                if name not in value
+            ]
+            for name, element in value.items():
+                validate = properties.get(name)
+                if validate is not None:
+                    errors.extend(validate(element, (*loc, name)))
+                elif additional is False:
+                    errors.append(
+                        _error((*loc, name), "Extra inputs are not permitted", "extra_forbidden")
+                    )
+            return errors
+
+        checks.append(check_object)
+
+    if len(checks) == 1:
+        return checks[0]
+    return lambda value, loc: [error for check in checks for error in check(value, loc)]
+
+
+def compile_params(params: dict) -> Validator:
+    """
+    Compile the ``params`` of an offer into a validator for call arguments.
+
+    ``params`` is either a JSON Schema with ``"type": "object"`` or a shorthand
+    mapping each argument name to its schema or JSON type name, e.g.
+    ``{"destination": "string", "nights": {"type": "integer", "minimum": 1}}``.
+    Anything else is read as shorthand, so an argument may be called "type".
+    The supported keywords are type, enum, minimum, maximum, minLength,
+    maxLength, items, properties, required and additionalProperties; all
+    others are ignored. The validator returns a list of error dicts in the
+    format of pydantic's ``ValidationError.errors()``, empty if valid.
+    """
+    if params.get("type") != "object":
+        params = {"type": "object", "properties": params}
+    return _compile(params)
+
+
+class ParamsValidators:
+    """
+    Compiled ``params`` validators of OfferCallables, by offercallable id.
+
+    Each validator is compiled once and reused until the OfferCallable it was
+    built from is replaced, e.g. by registering it again or a registry refresh.
+    """
+
+    def __init__(self, lookup: Callable[[UUID], OfferCallable | None]):
+        self.lookup = lookup
+        self._validators: dict[UUID, tuple[OfferCallable, Validator]] = {}
+        self.valid = 0
+        self.invalid = 0
+        self.unknown = 0
+
+    def put(self, offercallable: OfferCallable):
+        self._validators[offercallable.id] = (offercallable, compile_params(offercallable.params))
+
+    def validate(self, offercall: OfferCall) -> list[dict] | None:
+        """Return the errors of the call's args, or None if its OfferCallable is unknown."""
+        offercallable = self.lookup(offercall.offercallable_id)
+        if offercallable is None:
+            self._validators.pop(offercall.offercallable_id, None)
+            self.unknown += 1
+            return None
+        cached = self._validators.get(offercallable.id)
+        if cached is None or cached[0] is not offercallable:
+            self.put(offercallable)
+            cached = self._validators[offercallable.id]
+        errors = cached[1](offercall.args, ("args",))
+        if errors:
+            self.invalid += 1
+        else:
+            self.valid += 1
+        return errors
+
+    def stats(self) -> dict:
+        return {
+            "compiled": len(self._validators),
+            "valid": self.valid,
+            "invalid": self.invalid,
+            "unknown": self.unknown,
+        }
@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Callable, Literal
+
+from pydantic import BaseModel, Field
+
+
+class ProfileRequest(BaseModel):
+    seconds: float = Field(10.0, gt=0)
+    interval: float = Field(0.005, gt=0)
+    threads: Literal["loop", "all"] = "loop"
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples thread stacks from a background thread.
+
+    Every ``interval`` seconds the stacks of the profiled threads are read with
+    ``sys._current_frames()``; the profiled code is never instrumented, so the
+    overhead is one stack walk per sample. Stacks running through a handler are
+    rooted at a ``handler:<EventType>:<handler>`` frame, so flame graphs group
+    the time by handler.
+    """
+
+    def __init__(self, attribute: Callable[[FrameType], tuple[str, str] | None]):
+        self.attribute = attribute
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _stack(self, frame: FrameType, thread_name: str | None) -> str:
+        names = []
+        current = frame
+        while current is not None:
+            names.append(_frame_name(current))
+            current = current.f_back
+        names.reverse()
+        match = self.attribute(frame)
+        if match is not None:
+            handler, event_type = match
+            names.insert(0, f"handler:{event_type}:{handler}".replace(";", ":"))
+        if thread_name is not None:
+            names.insert(0, f"thread:{thread_name}".replace(";", ":"))
+        return ";".join(names)
+
+    def profile(
+        self, seconds: float, interval: float, thread_ids: set[int] | None = None
+    ) -> Counter:
+        """
+        Sample for ``seconds`` and return the count of each collapsed stack.
+
+        Only the threads in ``thread_ids`` are sampled, or every thread except the
+        profiler's own if it is None, in which case stacks are rooted at their thread name.
+        Blocks the calling thread; run it off the event loop.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            own = threading.get_ident()
+            stacks: Counter = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = (
+                    None
+                    if thread_ids is not None
+                    else {t.ident: t.name for t in threading.enumerate()}
+                )
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own or (thread_ids is not None and thread_id not in thread_ids):
+                        continue
+                    thread_name = None if names is None else names.get(thread_id, str(thread_id))
+                    stacks[self._stack(frame, thread_name)] += 1
+                time.sleep(interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapse(stacks: Counter) -> str:
+        """Render stack counts in the collapsed format of flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Hashable
+
+from pydantic import BaseModel
+
+from .app_types import (
+    NewOfferCallableCostResponse,
+    NewOfferReferenceCostResponse,
+    OfferCallableCostRequest,
+    OfferReferenceCostRequest,
+)
+
+COST_RESPONSE_TYPES = {
+    OfferCallableCostRequest: NewOfferCallableCostResponse,
+    OfferReferenceCostRequest: NewOfferReferenceCostResponse,
+}
+
+# The cost request being handled and its cache key, while its handler runs.
+current_quote: ContextVar[tuple[BaseModel, Hashable] | None] = ContextVar(
+    "current_quote", default=None
+)
+
+
+def quote_for(request: BaseModel, cached: BaseModel) -> BaseModel:
+    """Address a cached cost response to another request."""
+    update = {"intent_id": request.intent.id}
+    if isinstance(request, OfferCallableCostRequest):
+        update["offercallable_id"] = request.offercallable_id
+    else:
+        update["offerreference_id"] = request.offerreference_id
+    return cached.model_copy(update=update)
+
+
+class QuoteCache:
+    """
+    LRU cache of cost responses with per-entry expiry.
+
+    Entries are keyed by the cost request type and the result of the key
+    function registered for it, so requests that map to the same key share
+    one quote until it expires after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.key_funcs: dict[type, Callable[[BaseModel], Hashable]] = {}
+        self._entries: OrderedDict[tuple, tuple[float, BaseModel]] = OrderedDict()
+        self._counters = {
+            request_type.__name__: {"hits": 0, "misses": 0, "stored": 0}
+            for request_type in COST_RESPONSE_TYPES
+        }
+        self.evicted = 0
+
+    def key(self, request: BaseModel) -> Hashable | None:
+        key_func = self.key_funcs.get(type(request))
+        if key_func is None:
+            return None
+        return (type(request), key_func(request))
+
+    def get(self, request: BaseModel) -> BaseModel | None:
+        """Return the cached response addressed to ``request``, or None on a miss."""
+        key = self.key(request)
+        if key is None:
+            return None
+        counters = self._counters[type(request).__name__]
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        counters["hits"] += 1
+        return quote_for(request, entry[1])
+
+    def put(self, key: Hashable, request: BaseModel, response: BaseModel):
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        self._counters[type(request).__name__]["stored"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def capture(self, response: BaseModel):
+        """Store ``response`` if it answers the cost request whose handler is running."""
+        current = current_quote.get()
+        if current is None:
+            return
+        request, key = current
+        if (
+            isinstance(response, COST_RESPONSE_TYPES[type(request)])
+            and response.intent_id == request.intent.id
+        ):
+            self.put(key, request, response)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def counts(self, counter: str) -> dict[str, int]:
+        """Return the ``counter`` ("hits", "misses" or "stored") of each cost request type."""
+        return {name: counters[counter] for name, counters in self._counters.items()}
+
+    def stats(self) -> dict:
+        stats = {}
+        for name, counters in self._counters.items():
+            lookups = counters["hits"] + counters["misses"]
+            stats[name] = {**counters, "hit_rate": counters["hits"] / lookups if lookups else 0.0}
+        stats["entries"] = len(self)
+        stats["evicted"] = self.evicted
+        return stats
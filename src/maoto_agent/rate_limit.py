@@ -0,0 +1,153 @@
+import asyncio
+import re
+import time
+
+import httpx
+
+from .retry import parse_retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket whose waiters are served in arrival order.
+
+    ``rate`` is in requests per second; None means unlimited, in which case
+    the bucket only enforces pauses learned from the upstream. Waiters queue
+    on a FIFO lock, so callers are released fairly instead of racing.
+    """
+
+    def __init__(self, rate: float | None, burst: float):
+        self.configured_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.waits = 0
+        self.wait_time = 0.0
+        self.pauses = 0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate is None:
+                    break
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            self.waits += 1
+            self.wait_time += waited
+
+    def pause(self, seconds: float):
+        self.pauses += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    def learn(
+        self,
+        limit: float | None,
+        window: float | None,
+        remaining: float | None,
+        reset: float | None,
+    ):
+        if limit is not None and window:
+            learned = limit / window
+            if self.configured_rate is None or learned < self.configured_rate:
+                self.rate = learned
+                self.burst = min(self.burst, limit) if self.configured_rate else limit
+        if remaining is not None:
+            self.tokens = min(self.tokens, remaining)
+            if remaining < 1 and reset:
+                self.pause(reset)
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "tokens": self.tokens,
+            "waits": self.waits,
+            "wait_time": self.wait_time,
+            "pauses": self.pauses,
+        }
+
+
+def _header_float(response: httpx.Response, *names: str) -> float | None:
+    for name in names:
+        value = response.headers.get(name)
+        if value is not None:
+            try:
+                return float(value.split(",")[0].split(";")[0])
+            except ValueError:
+                continue
+    return None
+
+
+class RateLimiter:
+    """
+    Client-side rate limits for outbound calls, per upstream and per route.
+
+    Limits are keyed by upstream (``"mp"``, ``"pa"``) or ``"<upstream>:<route>"``
+    and given in requests per second. Every call waits for a token from its
+    route bucket and then from its upstream bucket. Responses adjust the
+    buckets: ``Retry-After`` on 429/503 pauses the upstream, and
+    ``RateLimit-*`` / ``X-RateLimit-*`` headers lower the rate and pause the
+    route bucket once the remaining quota is used up.
+    """
+
+    def __init__(self, limits: dict[str, float], burst_seconds: float):
+        self.limits = limits
+        self.burst_seconds = burst_seconds
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate = self.limits.get(key)
+            burst = max(1.0, rate * self.burst_seconds) if rate is not None else 1.0
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    @staticmethod
+    def route_key(upstream: str, route: str | None) -> str:
+        return f"{upstream}:{(route or '').split('?')[0].strip('/')}"
+
+    async def acquire(self, upstream: str, route: str | None):
+        await self.bucket(self.route_key(upstream, route)).acquire()
+        await self.bucket(upstream).acquire()
+
+    def observe(self, upstream: str, route: str | None, response: httpx.Response):
+        if response.status_code in (429, 503):
+            retry_after = parse_retry_after(response)
+            if retry_after:
+                self.bucket(upstream).pause(retry_after)
+
+        limit = _header_float(response, "RateLimit-Limit", "X-RateLimit-Limit")
+        remaining = _header_float(response, "RateLimit-Remaining", "X-RateLimit-Remaining")
+        reset = _header_float(response, "RateLimit-Reset", "X-RateLimit-Reset")
+        if limit is None and remaining is None:
+            return
+        if reset is not None and reset > time.time() - 86400:
+            reset = max(0.0, reset - time.time())  # epoch timestamp
+        window = None
+        policy = response.headers.get("RateLimit-Policy")
+        match = re.search(r"w=(\d+(?:\.\d+)?)", policy or "")
+        if match:
+            window = float(match.group(1))
+        self.bucket(self.route_key(upstream, route)).learn(limit, window, remaining, reset)
+
+    def stats(self) -> dict[str, dict]:
+        return {key: bucket.stats() for key, bucket in self._buckets.items()}
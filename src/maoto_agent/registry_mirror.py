@@ -0,0 +1,149 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from loguru import logger
+from pydantic import BaseModel
+
+from .app_types import NewRefCode, OfferCallable, OfferReference, RefCode, Skill
+
+MIRRORED_TYPES = (Skill, OfferCallable, OfferReference, RefCode)
+
+
+class _Index:
+    """Objects of one mirrored type, indexed by id, solver id and refcode value."""
+
+    def __init__(self, objects=()):
+        self.by_id: dict[UUID, BaseModel] = {}
+        self.by_solver: dict[UUID, dict[UUID, BaseModel]] = {}
+        self.by_value: dict[str, BaseModel] = {}
+        self.by_offercallable: dict[UUID, dict[str, BaseModel]] = {}
+        for obj in objects:
+            self.put(obj)
+
+    def put(self, obj: BaseModel):
+        if isinstance(obj, NewRefCode):
+            self.remove_value(obj.value)
+            self.by_value[obj.value] = obj
+            self.by_offercallable.setdefault(obj.offercallable_id, {})[obj.value] = obj
+            return
+        self.remove(obj.id)
+        self.by_id[obj.id] = obj
+        if obj.solver_id is not None:
+            self.by_solver.setdefault(obj.solver_id, {})[obj.id] = obj
+
+    def remove(self, id: UUID):
+        obj = self.by_id.pop(id, None)
+        if obj is not None and obj.solver_id is not None:
+            solver = self.by_solver.get(obj.solver_id, {})
+            solver.pop(id, None)
+            if not solver:
+                self.by_solver.pop(obj.solver_id, None)
+
+    def remove_solver(self, solver_id: UUID):
+        for id in list(self.by_solver.get(solver_id, {})):
+            self.remove(id)
+
+    def remove_value(self, value: str):
+        obj = self.by_value.pop(value, None)
+        if obj is not None:
+            codes = self.by_offercallable.get(obj.offercallable_id, {})
+            codes.pop(value, None)
+            if not codes:
+                self.by_offercallable.pop(obj.offercallable_id, None)
+
+    def remove_offercallable(self, offercallable_id: UUID):
+        for value in list(self.by_offercallable.get(offercallable_id, {})):
+            self.remove_value(value)
+
+
+class RegistryMirror:
+    """
+    In-process copy of the agent's Skills, OfferCallables, OfferReferences and RefCodes.
+
+    Lookups are dictionary reads and never touch the network, so they may be up
+    to ``ttl`` seconds stale with respect to changes made by other processes.
+    Changes made through this agent are applied write-through as soon as the
+    Marketplace or Assistant confirms them. ``refresh`` reloads a type from
+    upstream; ``run`` does so for every type each ``ttl`` seconds.
+    """
+
+    def __init__(self, fetch: Callable[[type], Awaitable[list]], ttl: float):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._indexes = {type_ref: _Index() for type_ref in MIRRORED_TYPES}
+        self._loaded: dict[type, float] = {}
+        self._pending: dict[type, list[Callable[[_Index], None]]] = {}
+        self._locks = {type_ref: asyncio.Lock() for type_ref in MIRRORED_TYPES}
+
+    def _apply(self, type_ref: type, op: Callable[[_Index], None]):
+        op(self._indexes[type_ref])
+        if type_ref in self._pending:
+            self._pending[type_ref].append(op)
+
+    async def refresh(self, type_ref: type | None = None):
+        """Reload one mirrored type, or all of them, from upstream."""
+        for current in (type_ref,) if type_ref else MIRRORED_TYPES:
+            async with self._locks[current]:
+                self._pending[current] = []
+                try:
+                    index = _Index(await self._fetch(current))
+                    for op in self._pending[current]:
+                        op(index)
+                finally:
+                    del self._pending[current]
+                self._indexes[current] = index
+                self._loaded[current] = time.monotonic()
+
+    async def run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                logger.warning(f"Registry mirror refresh failed: {exc}")
+            await asyncio.sleep(self.ttl)
+
+    def age(self, type_ref: type) -> float | None:
+        """Seconds since ``type_ref`` was last refreshed, or None if it never was."""
+        loaded = self._loaded.get(type_ref)
+        return None if loaded is None else time.monotonic() - loaded
+
+    def put(self, obj: Skill | OfferCallable | OfferReference | RefCode | NewRefCode):
+        type_ref = RefCode if isinstance(obj, NewRefCode) else type(obj)
+        self._apply(type_ref, lambda index: index.put(obj))
+
+    def remove(self, type_ref: type, id: UUID | None = None, solver_id: UUID | None = None):
+        if id is not None:
+            self._apply(type_ref, lambda index: index.remove(id))
+        elif solver_id is not None:
+            self._apply(type_ref, lambda index: index.remove_solver(solver_id))
+
+    def remove_refcode(self, value: str | None = None, offercallable_id: UUID | None = None):
+        if value is not None:
+            self._apply(RefCode, lambda index: index.remove_value(value))
+        elif offercallable_id is not None:
+            self._apply(RefCode, lambda index: index.remove_offercallable(offercallable_id))
+
+    def get(self, type_ref: type[Skill | OfferCallable | OfferReference], id: UUID):
+        """Return the object of ``type_ref`` with the given id, or None."""
+        return self._indexes[type_ref].by_id.get(id)
+
+    def by_solver(
+        self, type_ref: type[Skill | OfferCallable | OfferReference], solver_id: UUID
+    ) -> list:
+        """Return all objects of ``type_ref`` registered with the given solver id."""
+        return list(self._indexes[type_ref].by_solver.get(solver_id, {}).values())
+
+    def all(self, type_ref: type[Skill | OfferCallable | OfferReference | RefCode]) -> list:
+        """Return all mirrored objects of ``type_ref``."""
+        index = self._indexes[type_ref]
+        return list((index.by_value if type_ref is RefCode else index.by_id).values())
+
+    def refcode(self, value: str) -> RefCode | NewRefCode | None:
+        """Return the reference code with the given value, or None."""
+        return self._indexes[RefCode].by_value.get(value)
+
+    def refcodes_for(self, offercallable_id: UUID) -> list[RefCode | NewRefCode]:
+        """Return all reference codes pointing to the given OfferCallable."""
+        return list(self._indexes[RefCode].by_offercallable.get(offercallable_id, {}).values())
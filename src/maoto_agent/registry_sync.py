@@ -0,0 +1,83 @@
+from pydantic import BaseModel
+
+from .app_types import (
+    NewOfferCallable,
+    NewOfferReference,
+    NewSkill,
+    OfferCallable,
+    OfferReference,
+    Skill,
+)
+
+REGISTERED_TYPES = {
+    NewSkill: Skill,
+    NewOfferCallable: OfferCallable,
+    NewOfferReference: OfferReference,
+}
+
+
+class RegistrySyncReport(BaseModel):
+    registered: list[Skill | OfferCallable | OfferReference] = []
+    unregistered: list[Skill | OfferCallable | OfferReference] = []
+    unchanged: int = 0
+    errors: list[str] = []
+    duration: float = 0.0
+
+
+def sync_key(obj: BaseModel) -> tuple:
+    """Stable identity of a registered object: its type, solver id and description."""
+    type_ref = REGISTERED_TYPES.get(type(obj), type(obj))
+    return (type_ref, obj.solver_id, obj.description)
+
+
+def is_current(existing: BaseModel, desired: BaseModel) -> bool:
+    """Whether an already registered object matches the desired one field for field."""
+    fields = set(type(desired).model_fields)
+    return existing.model_dump(include=fields) == desired.model_dump()
+
+
+def plan_sync(
+    current: list[Skill | OfferCallable | OfferReference],
+    desired: list[NewSkill | NewOfferCallable | NewOfferReference],
+    prune: bool,
+) -> tuple[list, list[tuple], list, int]:
+    """
+    Diff the registered objects against the desired ones.
+
+    Returns the objects to register, the ``(desired, registered)`` pairs of
+    registered objects to replace, the objects to unregister and the number of
+    desired objects already registered unchanged. A desired object whose key
+    matches a registered one with different fields replaces it. Duplicate
+    registrations of the same key are removed.
+    """
+    existing: dict[tuple, BaseModel] = {}
+    duplicates = []
+    for obj in current:
+        key = sync_key(obj)
+        if key in existing:
+            duplicates.append(obj)
+        else:
+            existing[key] = obj
+
+    to_register = []
+    to_replace = []
+    to_unregister = []
+    unchanged = 0
+    wanted = set()
+    for obj in desired:
+        key = sync_key(obj)
+        if key in wanted:
+            continue
+        wanted.add(key)
+        match = existing.get(key)
+        if match is None:
+            to_register.append(obj)
+        elif is_current(match, obj):
+            unchanged += 1
+        else:
+            to_replace.append((obj, match))
+
+    if prune:
+        to_unregister.extend(obj for key, obj in existing.items() if key not in wanted)
+    to_unregister.extend(obj for obj in duplicates if prune or sync_key(obj) in wanted)
+    return to_register, to_replace, to_unregister, unchanged
@@ -0,0 +1,174 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Literal
+
+import httpx
+from loguru import logger
+
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+# Errors raised before a request reached the server, so it cannot have been processed.
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def is_retryable(response: httpx.Response, idempotent: bool) -> bool:
+    """
+    Return whether a request that got an error ``response`` may be sent again.
+
+    A non-idempotent request may already have been processed when a gateway
+    answers 502 or 504, so it is only retried on statuses that guarantee it was
+    not: 429, and 503 with a ``Retry-After`` header.
+    """
+    status = response.status_code
+    if idempotent:
+        return status in RETRYABLE_STATUS_CODES
+    return status == 429 or (status == 503 and "Retry-After" in response.headers)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker of its upstream is open."""
+
+
+def parse_retry_after(response: httpx.Response) -> float | None:
+    """Return the delay requested by a ``Retry-After`` header in seconds, if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class RetryBudget:
+    """
+    Process-wide limit on retries.
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one, so
+    retries stay a bounded fraction of the traffic. ``min_per_second`` tokens
+    are added over time so that low-traffic agents can still retry.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.exhausted = 0
+        self._updated = time.monotonic()
+
+    def _refill(self, amount: float = 0.0):
+        now = time.monotonic()
+        amount += (now - self._updated) * self.min_per_second
+        self._updated = now
+        self.tokens = min(self.max_tokens, self.tokens + amount)
+
+    def record_request(self):
+        self._refill(self.ratio)
+
+    def try_spend(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def stats(self) -> dict:
+        self._refill()
+        return {"tokens": self.tokens, "exhausted": self.exhausted}
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one upstream.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail fast with CircuitOpenError. Once ``reset_timeout`` has passed,
+    the next call moves it to half-open and runs ``probe`` first: a successful
+    probe closes the breaker, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        probe: Callable[[], Awaitable] | None = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.state: Literal["closed", "open", "half_open"] = "closed"
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.opened = 0
+        self.rejected = 0
+        self._probe_lock = asyncio.Lock()
+
+    async def before_call(self):
+        if self.state == "closed":
+            return
+        async with self._probe_lock:
+            if self.state == "closed":
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+            self.state = "half_open"
+            if self.probe is None:
+                return
+            try:
+                await self.probe()
+            except Exception as exc:
+                logger.warning(f"Probe of {self.name} failed: {exc}")
+                self._open()
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit breaker for {self.name} is open") from exc
+            self.record_success()
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info(f"Circuit breaker for {self.name} closed")
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        if self.state != "open":
+            self.opened += 1
+            logger.warning(f"Circuit breaker for {self.name} opened")
+        self.state = "open"
+        self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
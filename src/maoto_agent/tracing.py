@@ -0,0 +1,205 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from pydantic import BaseModel
+
+from .app_types import Intent, OfferCall
+
+current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+_NO_SPAN = nullcontext()
+
+_CORRELATION_FIELDS = {
+    "intent_id": "intent.id",
+    "offercall_id": "offercall.id",
+    "offercallable_id": "offercallable.id",
+    "offerreference_id": "offerreference.id",
+    "skill_id": "skill.id",
+}
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+def correlation_attributes(obj: Any) -> dict[str, str]:
+    """
+    Ids carried by an event or response model, as span attributes.
+
+    An OfferCall and the NewOfferCallResponse sent for it both yield
+    ``offercall.id``, so spans of inbound events and outbound responses can be
+    matched across traces.
+    """
+    if not isinstance(obj, BaseModel):
+        return {}
+    attributes = {}
+    if isinstance(obj, (Intent, OfferCall)):
+        attributes["intent.id" if isinstance(obj, Intent) else "offercall.id"] = str(obj.id)
+    intent = getattr(obj, "intent", None)
+    if isinstance(intent, Intent):
+        attributes["intent.id"] = str(intent.id)
+    for field, key in _CORRELATION_FIELDS.items():
+        value = getattr(obj, field, None)
+        if value is not None:
+            attributes[key] = str(value)
+    return attributes
+
+
+class Span:
+    """A timed operation within a trace. Times are Unix timestamps in seconds."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start",
+        "end",
+        "attributes",
+        "status",
+        "error",
+    )
+
+    def __init__(self, name: str, parent: "Span | None", start: float, attributes: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = start
+        self.end: float | None = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: str | None = None
+
+    @property
+    def duration(self) -> float | None:
+        return None if self.end is None else self.end - self.start
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__} | {"duration": self.duration}
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, trace_id={self.trace_id}, duration={self.duration})"
+
+
+class SpanExporter(ABC):
+    """
+    Receives every finished span.
+
+    Subclass it to forward spans to a tracing backend. ``export`` runs on the
+    event loop, so it should only hand the span off, e.g. to a queue.
+    """
+
+    @abstractmethod
+    def export(self, span: Span):
+        pass
+
+
+class RingBufferExporter(SpanExporter):
+    """Keeps the last ``max_spans`` finished spans in memory, e.g. for tests or a debug view."""
+
+    def __init__(self, max_spans: int = 1024):
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def clear(self):
+        self.spans.clear()
+
+    def trace(self, trace_id: str) -> list[Span]:
+        """Return the spans of one trace in start order."""
+        return sorted(
+            (span for span in self.spans if span.trace_id == trace_id), key=lambda span: span.start
+        )
+
+    def find(self, name: str | None = None, **attributes) -> list[Span]:
+        """Return the spans with the given name prefix and attribute values."""
+        return [
+            span
+            for span in self.spans
+            if (name is None or span.name.startswith(name))
+            and all(span.attributes.get(key) == value for key, value in attributes.items())
+        ]
+
+
+class Tracer:
+    """
+    Creates spans and propagates the active one through a context variable.
+
+    Without an exporter tracing is off and every call returns immediately
+    without creating spans.
+    """
+
+    def __init__(self, exporter: SpanExporter | None = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(
+        self, name: str, parent: Span | None = None, start: float | None = None, **attributes
+    ) -> Span | None:
+        """Start a span without activating it. The parent defaults to the active span."""
+        if self.exporter is None:
+            return None
+        if parent is None:
+            parent = current_span.get()
+        return Span(name, parent, time.time() if start is None else start, attributes)
+
+    def end_span(
+        self, span: Span | None, error: BaseException | None = None, end: float | None = None
+    ):
+        if span is None or span.end is not None:
+            return
+        span.end = time.time() if end is None else end
+        if error is not None:
+            span.status = "error"
+            span.error = f"{type(error).__name__}: {error}"
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    @contextmanager
+    def activate(self, span: Span | None) -> Iterator[Span | None]:
+        """Make ``span`` the parent of the spans started inside the block."""
+        if span is None:
+            yield None
+            return
+        token = current_span.set(span)
+        try:
+            yield span
+        finally:
+            current_span.reset(token)
+
+    def span(self, name: str, parent: Span | None = None, **attributes):
+        """Time the block as a span, child of ``parent`` or of the active span."""
+        if self.exporter is None:
+            return _NO_SPAN
+        return self._span(name, parent, attributes)
+
+    @contextmanager
+    def _span(self, name: str, parent: Span | None, attributes: dict) -> Iterator[Span]:
+        span = self.start_span(name, parent, **attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            self.end_span(span, exc)
+            raise
+        finally:
+            current_span.reset(token)
+            self.end_span(span)
+
+    def record(self, name: str, start: float, end: float, parent: Span | None = None, **attributes):
+        """Export a span for an interval that has already passed."""
+        span = self.start_span(name, parent, start, **attributes)
+        self.end_span(span, end=end)
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from pydantic import BaseModel
+
+from maoto_agent import Maoto, OfferCall
+
+# AgentSettings requires an API key; the tests never reach a real Marketplace.
+os.environ.setdefault("MAOTO_APIKEY", "test-apikey")
+os.environ.setdefault("MAOTO_LOOP_WATCHDOG", "false")
+
+
+@pytest.fixture
+def mock_upstream():
+    """Send the outbound calls of a Maoto to an httpx.MockTransport handler instead."""
+
+    def install(maoto, handler, upstream: str = "mp"):
+        url = maoto._settings.url_mp if upstream == "mp" else maoto._settings.url_pa
+        transport = httpx.MockTransport(handler)
+        maoto._clients[str(url)] = httpx.AsyncClient(transport=transport, headers=maoto._headers)
+
+    return install
+
+
+@pytest.fixture
+def make_offercall():
+    """Build an OfferCall with fresh ids."""
+
+    def make(**fields) -> OfferCall:
+        return OfferCall(
+            **{
+                "id": uuid.uuid4(),
+                "time": datetime.now(timezone.utc),
+                "apikey_id": uuid.uuid4(),
+                "solver_id": None,
+                "offercallable_id": uuid.uuid4(),
+                "provider_id": None,
+                "deputy_apikey_id": None,
+                "args": {"nights": 2},
+                **fields,
+            }
+        )
+
+    return make
+
+
+@pytest.fixture
+def post_event():
+    """Deliver a signed webhook event to a Maoto through its ASGI app."""
+
+    async def post(maoto: Maoto, event: BaseModel, headers: dict | None = None) -> httpx.Response:
+        path = f"/{type(event).__name__}"
+        body = event.model_dump_json().encode()
+        timestamp = str(int(time.time()))
+        signature = Maoto._make_signature(
+            "POST", path, timestamp, body, maoto._settings.apikey_hashed
+        )
+        headers = {
+            "Signature": signature,
+            "Timestamp": timestamp,
+            "Content-Type": "application/json",
+            **(headers or {}),
+        }
+        transport = httpx.ASGITransport(app=maoto)
+        async with httpx.AsyncClient(transport=transport, base_url="http://agent") as client:
+            return await client.post(path, content=body, headers=headers)
+
+    return post
+
+
+@pytest.fixture
+def wait_for():
+    """Wait until a condition holds, failing the test after ``timeout`` seconds."""
+
+    async def wait(condition, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "condition not met in time"
+            await asyncio.sleep(0.01)
+
+    return wait
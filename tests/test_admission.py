@@ -0,0 +1,72 @@
+import asyncio
+
+from maoto_agent import Maoto, OfferCall
+from maoto_agent.admission import AdaptiveLimiter
+
+
+def test_limiter_grows_under_target_and_backs_off_above_it():
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=4, max_limit=11, target_latency=1.0)
+    for _ in range(30):
+        limiter.observe(0.1)
+    assert limiter.limit == 11
+    limiter.observe(5.0)
+    assert int(limiter.limit) == 9
+    limiter.observe(5.0)
+    assert int(limiter.limit) == 9, "decreases at most once per target interval"
+    assert limiter.admits(8) and not limiter.admits(9)
+    assert limiter.retry_after(1) == 2
+
+
+def test_overloaded_agent_answers_503_before_reading_the_body(
+    monkeypatch, make_offercall, post_event, wait_for
+):
+    monkeypatch.setenv("MAOTO_ADMISSION_CONTROL", "true")
+    monkeypatch.setenv("MAOTO_ADMISSION_INITIAL_LIMIT", "1")
+    monkeypatch.setenv("MAOTO_ADMISSION_MIN_LIMIT", "1")
+    monkeypatch.setenv("MAOTO_RETRY_AFTER", "3")
+
+    async def run():
+        maoto = Maoto()
+        release = asyncio.Event()
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            await release.wait()
+
+        async with maoto.router.lifespan_context(maoto):
+            assert (await post_event(maoto, make_offercall())).status_code == 200
+            await wait_for(lambda: maoto.admission_stats()["in_flight"] == 1)
+
+            received, sent = [], []
+
+            async def receive():
+                received.append(True)
+                return {"type": "http.request", "body": b"{}", "more_body": False}
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "POST",
+                "scheme": "http",
+                "path": "/OfferCall",
+                "raw_path": b"/OfferCall",
+                "query_string": b"",
+                "root_path": "",
+                "headers": [(b"content-type", b"application/json")],
+                "client": ("127.0.0.1", 1234),
+                "server": ("agent", 80),
+            }
+            await maoto(scope, receive, send)
+            release.set()
+            return received, sent, maoto.admission_stats()
+
+    received, sent, stats = asyncio.run(run())
+    start = sent[0]
+    assert start["status"] == 503
+    assert (b"retry-after", b"3") in start["headers"]
+    assert received == []
+    assert stats["rejected"] == 1
@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from maoto_agent import Maoto, Skill
+
+
+def skill() -> Skill:
+    return Skill(
+        id=uuid.uuid4(),
+        apikey_id=uuid.uuid4(),
+        time=datetime.now(timezone.utc),
+        description="Book hotels",
+        params={},
+        solver_id=None,
+        tags=[],
+    )
+
+
+def test_coalesces_gets_with_unhashable_params(mock_upstream):
+    requests = []
+    body = f"[{skill().model_dump_json()}]"
+
+    async def marketplace(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.params.multi_items())
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=body)
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, marketplace)
+
+        def get(params):
+            return maoto._request(
+                "GET",
+                params=params,
+                result_type=Skill,
+                is_list=True,
+                route="getSkills",
+                url=maoto._settings.url_mp,
+                coalesce=True,
+            )
+
+        try:
+            results = await asyncio.gather(
+                get({"tags": ["hotel", "travel"], "solver": None}),
+                get({"solver": None, "tags": ["hotel", "travel"]}),
+                get({"tags": ["travel"]}),
+            )
+            return results, maoto.coalescing_stats()
+        finally:
+            await maoto.aclose()
+
+    results, stats = asyncio.run(run())
+    assert len(requests) == 2
+    assert stats == {"requests": 2, "coalesced": 1, "in_flight": 0}
+    assert results[0] == results[1] and results[0] is not results[1]
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from maoto_agent import Intent, IntentResponse, Maoto, NewIntent, OfferCallResponse
+from maoto_agent.correlation import CorrelationTable
+
+
+def intent_response(intent_id: uuid.UUID, description: str) -> IntentResponse:
+    return IntentResponse(intent_id=intent_id, provider_id="hotels", description=description)
+
+
+def test_table_expires_and_evicts_unawaited_responses():
+    table = CorrelationTable(max_entries=2, ttl=0.05)
+    for key in ("a", "b", "c"):
+        table.publish(key, key.upper())
+    assert table.stats()["evicted"] == 1 and len(table) == 2
+
+    time.sleep(0.06)
+    table.publish("d", "D")
+    assert table.stats()["expired"] == 2 and len(table) == 1
+
+
+def test_send_intent_and_wait_returns_a_response_that_arrived_first(mock_upstream, post_event):
+    handled = []
+
+    async def run():
+        maoto = Maoto()
+        intent_id = uuid.uuid4()
+
+        @maoto.register_handler(IntentResponse)
+        async def handle(response):
+            handled.append(response.description)
+
+        async def marketplace(request: httpx.Request) -> httpx.Response:
+            await post_event(maoto, intent_response(uuid.uuid4(), "for someone else"))
+            await post_event(maoto, intent_response(intent_id, "booked"))
+            intent = Intent(
+                **json.loads(request.content),
+                id=intent_id,
+                apikey_id=uuid.uuid4(),
+                test=True,
+                time=datetime.now(timezone.utc),
+                resolved=False,
+            )
+            return httpx.Response(200, content=intent.model_dump_json())
+
+        mock_upstream(maoto, marketplace)
+        async with maoto.router.lifespan_context(maoto):
+            new_intent = NewIntent(description="A hotel in Rome", provider_id=None, tags=[])
+            response = await maoto.send_intent_and_wait(new_intent, timeout=1)
+        return response, maoto.correlation_stats()
+
+    response, stats = asyncio.run(run())
+    assert response.description == "booked"
+    assert sorted(handled) == ["booked", "for someone else"]
+    assert stats["delivered"] == 1 and stats["waiting"] == 0
+
+
+def test_send_intent_and_wait_times_out(mock_upstream):
+    async def run():
+        maoto = Maoto()
+
+        def marketplace(request: httpx.Request) -> httpx.Response:
+            intent = {
+                **json.loads(request.content),
+                "id": str(uuid.uuid4()),
+                "apikey_id": str(uuid.uuid4()),
+                "test": True,
+                "time": datetime.now(timezone.utc).isoformat(),
+                "resolved": False,
+            }
+            return httpx.Response(200, json=intent)
+
+        mock_upstream(maoto, marketplace)
+        async with maoto.router.lifespan_context(maoto):
+            new_intent = NewIntent(description="A hotel in Rome", provider_id=None, tags=[])
+            with pytest.raises(TimeoutError):
+                await maoto.send_intent_and_wait(new_intent, timeout=0.05)
+            assert "/IntentResponse" in maoto._handler_paths
+        return maoto.correlation_stats()
+
+    assert asyncio.run(run())["keys"] == 0
+
+
+def test_offercall_responses_streams_until_quiet(post_event):
+    offercall_id = uuid.uuid4()
+
+    def response(description: str) -> OfferCallResponse:
+        return OfferCallResponse(
+            id=uuid.uuid4(),
+            offercall_id=offercall_id,
+            offercallable_id=uuid.uuid4(),
+            description=description,
+            provider_id="hotels",
+            time=datetime.now(timezone.utc),
+            apikey_id=uuid.uuid4(),
+        )
+
+    async def run():
+        maoto = Maoto()
+
+        @maoto.register_handler(OfferCallResponse)
+        async def handle(response):
+            pass
+
+        async with maoto.router.lifespan_context(maoto):
+            received = []
+            stream = maoto.offercall_responses(offercall_id, timeout=0.2)
+            # Arrives before the stream is iterated, so it has to be buffered.
+            assert (await post_event(maoto, response("searching"))).status_code == 200
+            async for item in stream:
+                received.append(item.description)
+                if len(received) == 1:
+                    await post_event(maoto, response("booked"))
+            return received
+
+    assert asyncio.run(run()) == ["searching", "booked"]
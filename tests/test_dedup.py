@@ -0,0 +1,76 @@
+import asyncio
+
+from maoto_agent import Maoto, OfferCall
+from maoto_agent.dedup import MemoryDedupBackend, SQLiteDedupBackend
+
+
+def test_memory_backend_expires_and_evicts():
+    async def run():
+        backend = MemoryDedupBackend(max_entries=2)
+        assert not await backend.check_and_set("a", 60)
+        assert await backend.check_and_set("a", 60)
+        assert not await backend.check_and_set("b", 0)
+        assert not await backend.check_and_set("b", 60), "expired keys are accepted again"
+        assert not await backend.check_and_set("c", 60)
+        assert not await backend.check_and_set("a", 60), "the least recent key was evicted"
+        await backend.forget("c")
+        assert not await backend.check_and_set("c", 60)
+
+    asyncio.run(run())
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = tmp_path / "dedup" / "keys.sqlite"
+
+    async def run():
+        first = SQLiteDedupBackend(path, max_entries=100)
+        second = SQLiteDedupBackend(path, max_entries=100)
+        try:
+            assert not await first.check_and_set("OfferCall:1", 60)
+            assert await second.check_and_set("OfferCall:1", 60)
+            await second.forget("OfferCall:1")
+            assert not await first.check_and_set("OfferCall:1", 60)
+            assert not await first.check_and_set("OfferCall:2", -1)
+            assert not await second.check_and_set("OfferCall:2", 60), "expired keys are accepted"
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(run())
+
+
+def test_redelivery_is_accepted_after_a_rejected_delivery(
+    monkeypatch, tmp_path, make_offercall, post_event, wait_for
+):
+    monkeypatch.setenv("MAOTO_DEDUP_PATH", str(tmp_path / "dedup.sqlite"))
+    monkeypatch.setenv("MAOTO_HANDLER_WORKERS", "1")
+    monkeypatch.setenv("MAOTO_HANDLER_QUEUE_SIZE", "1")
+    handled = []
+
+    async def run():
+        maoto = Maoto()
+        assert isinstance(maoto._dedup, SQLiteDedupBackend)
+        release = asyncio.Event()
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            await release.wait()
+            handled.append(offercall.id)
+
+        first, second, third = make_offercall(), make_offercall(), make_offercall()
+        async with maoto.router.lifespan_context(maoto):
+            assert (await post_event(maoto, first)).status_code == 200
+            await wait_for(lambda: maoto._executor.stats()["OfferCall"]["in_flight"] == 1)
+            assert (await post_event(maoto, second)).status_code == 200
+            assert (await post_event(maoto, third)).status_code == 429
+
+            release.set()
+            await wait_for(lambda: len(handled) == 2)
+            assert (await post_event(maoto, third)).status_code == 200
+            assert (await post_event(maoto, first)).status_code == 200
+            await wait_for(lambda: len(handled) == 3)
+        return first, second, third, maoto._executor.stats()["OfferCall"]
+
+    first, second, third, stats = asyncio.run(run())
+    assert handled == [first.id, second.id, third.id]
+    assert stats["rejected"] == 1 and stats["duplicates"] == 1
@@ -0,0 +1,55 @@
+import asyncio
+
+from maoto_agent import Maoto, OfferCall
+
+
+def test_events_are_acknowledged_before_they_are_handled(make_offercall, post_event, wait_for):
+    handled = []
+
+    async def run():
+        maoto = Maoto()
+        release = asyncio.Event()
+
+        @maoto.register_handler(OfferCall, workers=1)
+        async def handle(offercall):
+            await release.wait()
+            handled.append(offercall.id)
+
+        calls = [make_offercall() for _ in range(3)]
+        async with maoto.router.lifespan_context(maoto):
+            for offercall in calls:
+                assert (await post_event(maoto, offercall)).status_code == 200
+            await wait_for(lambda: maoto.handler_stats()["OfferCall"]["in_flight"] == 1)
+            assert maoto.handler_stats()["OfferCall"]["queue_depth"] == 2
+            assert handled == []
+            release.set()
+        return calls, maoto.handler_stats()["OfferCall"]
+
+    calls, stats = asyncio.run(run())
+    assert handled == [offercall.id for offercall in calls], "queued events are drained at shutdown"
+    assert stats["processed"] == 3 and stats["queue_depth"] == 0
+
+
+def test_failing_handler_is_counted_and_does_not_stop_its_worker(
+    make_offercall, post_event, wait_for
+):
+    handled = []
+
+    async def run():
+        maoto = Maoto()
+
+        @maoto.register_handler(OfferCall, workers=1)
+        async def handle(offercall):
+            if offercall.args["nights"] == 0:
+                raise ValueError("no nights")
+            handled.append(offercall.id)
+
+        valid = make_offercall()
+        async with maoto.router.lifespan_context(maoto):
+            await post_event(maoto, make_offercall(args={"nights": 0}))
+            await post_event(maoto, valid)
+            await wait_for(lambda: handled == [valid.id])
+            return maoto.handler_stats()["OfferCall"]
+
+    stats = asyncio.run(run())
+    assert stats["failed"] == 1 and stats["processed"] == 1
@@ -0,0 +1,192 @@
+import asyncio
+import sqlite3
+
+import httpx
+import pytest
+
+from maoto_agent import Maoto, OfferCall
+from maoto_agent.durable_log import DurableLog
+from maoto_agent.outbox import Outbox
+
+
+async def unfinished(path, name: str) -> list:
+    log = DurableLog(path, name)
+    await log.open()
+    try:
+        return await log.unfinished()
+    finally:
+        await log.close()
+
+
+def test_inbox_replays_events_unfinished_at_shutdown(
+    tmp_path, monkeypatch, make_offercall, post_event, wait_for
+):
+    monkeypatch.setenv("MAOTO_INBOX_PATH", str(tmp_path / "inbox.db"))
+    monkeypatch.setenv("MAOTO_HANDLER_SHUTDOWN_TIMEOUT", "0.1")
+    event = make_offercall()
+
+    async def crashing_run():
+        maoto = Maoto()
+        started = asyncio.Event()
+
+        @maoto.register_handler(OfferCall)
+        async def stuck(offercall):
+            started.set()
+            await asyncio.Event().wait()
+
+        async with maoto.router.lifespan_context(maoto):
+            response = await post_event(maoto, event)
+            assert response.status_code == 200
+            await asyncio.wait_for(started.wait(), 5)
+
+    async def restarted_run() -> list:
+        maoto = Maoto()
+        handled = []
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            handled.append(offercall)
+
+        async with maoto.router.lifespan_context(maoto):
+            await wait_for(lambda: handled)
+        return handled
+
+    asyncio.run(crashing_run())
+    assert len(asyncio.run(unfinished(tmp_path / "inbox.db", "inbox"))) == 1
+
+    assert asyncio.run(restarted_run()) == [event]
+    assert asyncio.run(unfinished(tmp_path / "inbox.db", "inbox")) == []
+
+
+def test_inbox_forgets_handled_events(tmp_path, monkeypatch, make_offercall, post_event, wait_for):
+    monkeypatch.setenv("MAOTO_INBOX_PATH", str(tmp_path / "inbox.db"))
+
+    async def run():
+        maoto = Maoto()
+        handled = []
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            handled.append(offercall)
+
+        async with maoto.router.lifespan_context(maoto):
+            for _ in range(3):
+                assert (await post_event(maoto, make_offercall())).status_code == 200
+            await wait_for(lambda: len(handled) == 3)
+
+    asyncio.run(run())
+    assert asyncio.run(unfinished(tmp_path / "inbox.db", "inbox")) == []
+
+
+def test_outbox_redelivers_calls_left_over_from_previous_run(tmp_path, wait_for):
+    path = tmp_path / "outbox.db"
+    call = {"method": "POST", "route": "NewOfferCallResponse", "input": {"description": "done"}}
+
+    async def unreachable_run():
+        async def deliver(call):
+            raise httpx.ConnectError("Marketplace unreachable")
+
+        outbox = Outbox(deliver, 1, 0.01, 0.01, log=DurableLog(path, "outbox"))
+        ticket = await outbox.submit(call)
+        await asyncio.sleep(0.05)
+        await outbox.stop(0.05)
+        assert not ticket.done()
+
+    async def restarted_run() -> list:
+        delivered = []
+
+        async def deliver(call):
+            delivered.append(call)
+            return True
+
+        outbox = Outbox(deliver, 1, 0.01, 0.01, log=DurableLog(path, "outbox"))
+        await outbox.start()
+        await wait_for(lambda: delivered)
+        await outbox.stop(1)
+        return delivered
+
+    asyncio.run(unreachable_run())
+    assert asyncio.run(restarted_run()) == [call]
+    assert asyncio.run(unfinished(path, "outbox")) == []
+
+
+def test_outbox_does_not_resend_calls_that_may_have_been_processed(tmp_path):
+    attempts = []
+
+    async def run():
+        async def deliver(call):
+            attempts.append(call)
+            request = httpx.Request("POST", "http://mp/refund_offercall")
+            response = httpx.Response(502, request=request)
+            raise httpx.HTTPStatusError("Bad Gateway", request=request, response=response)
+
+        outbox = Outbox(deliver, 1, 0.01, 0.01, log=DurableLog(tmp_path / "outbox.db", "outbox"))
+        ticket = await outbox.submit({"route": "refund_offercall"})
+        try:
+            await ticket
+        except httpx.HTTPStatusError as exc:
+            assert exc.response.status_code == 502
+        else:
+            raise AssertionError("the call should have failed")
+        await outbox.stop(1)
+
+    asyncio.run(run())
+    assert len(attempts) == 1
+    assert asyncio.run(unfinished(tmp_path / "outbox.db", "outbox")) == []
+
+
+def test_put_requires_an_open_log(tmp_path):
+    async def run():
+        log = DurableLog(tmp_path / "inbox.db", "inbox")
+        with pytest.raises(RuntimeError, match="not open"):
+            await asyncio.wait_for(log.put("OfferCall", b"{}"), 1)
+
+    asyncio.run(run())
+
+
+def test_failed_commit_keeps_pending_deletes(tmp_path):
+    async def run():
+        log = DurableLog(tmp_path / "inbox.db", "inbox")
+        await log.open()
+        finished = await log.put("OfferCall", b"{}")
+
+        write = log._write
+        failures = []
+
+        def failing_write(puts, dones):
+            if not failures:
+                failures.append(dones)
+                raise sqlite3.OperationalError("disk I/O error")
+            write(puts, dones)
+
+        log._write = failing_write
+        log.done(finished)
+        with pytest.raises(sqlite3.OperationalError):
+            await log.put("OfferCall", b"{}")
+        assert failures == [[finished]]
+        kept = await log.put("OfferCall", b"{}")
+        await log.close()
+        return kept
+
+    kept = asyncio.run(run())
+    assert [id for id, *_ in asyncio.run(unfinished(tmp_path / "inbox.db", "inbox"))] == [kept]
+
+
+def test_outbox_does_not_resend_calls_after_a_protocol_error():
+    attempts = []
+
+    async def run():
+        async def deliver(call):
+            attempts.append(call)
+            if len(attempts) == 1:
+                raise httpx.ConnectError("Connection refused")
+            raise httpx.RemoteProtocolError("Server disconnected without sending a response")
+
+        outbox = Outbox(deliver, 1, 0.01, 0.01)
+        ticket = await outbox.submit({"route": "NewOfferCallResponse"})
+        with pytest.raises(httpx.RemoteProtocolError):
+            await ticket
+        await outbox.stop(1)
+
+    asyncio.run(run())
+    assert len(attempts) == 2
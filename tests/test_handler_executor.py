@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from maoto_agent.handler_executor import HandlerExecutor, Priority, QueueFullError
+
+
+class Booking:
+    pass
+
+
+class Alert:
+    pass
+
+
+def blocking_executor(full_policy: str, handled: list) -> tuple[HandlerExecutor, asyncio.Event]:
+    """Executor with one worker and a one-slot queue whose handler waits for a release."""
+    release = asyncio.Event()
+
+    async def handle(event):
+        await release.wait()
+        handled.append(event)
+
+    executor = HandlerExecutor(workers=1, queue_size=1, max_concurrency=1, full_policy=full_policy)
+    executor.add(Booking, handle)
+    return executor, release
+
+
+async def fill(executor: HandlerExecutor, wait_for, done: list):
+    await executor.submit(Booking, "first", done=lambda: done.append("first"))
+    await wait_for(lambda: executor.stats()["Booking"]["in_flight"] == 1)
+    await executor.submit(Booking, "second", done=lambda: done.append("second"))
+
+
+def test_reject_policy_raises_when_the_queue_is_full(wait_for):
+    handled, done = [], []
+
+    async def run():
+        executor, release = blocking_executor("reject", handled)
+        await fill(executor, wait_for, done)
+        with pytest.raises(QueueFullError):
+            await executor.submit(Booking, "third")
+        release.set()
+        await executor.stop(1.0)
+        return executor.stats()["Booking"]
+
+    stats = asyncio.run(run())
+    assert handled == ["first", "second"] and done == ["first", "second"]
+    assert stats["rejected"] == 1 and stats["processed"] == 2
+
+
+def test_drop_oldest_policy_discards_the_oldest_queued_event(wait_for):
+    handled, done = [], []
+
+    async def run():
+        executor, release = blocking_executor("drop_oldest", handled)
+        await fill(executor, wait_for, done)
+        await executor.submit(Booking, "third")
+        assert done == ["second"]
+        release.set()
+        await executor.stop(1.0)
+        return executor.stats()["Booking"]
+
+    stats = asyncio.run(run())
+    assert handled == ["first", "third"]
+    assert stats["dropped"] == 1 and stats["processed"] == 2
+
+
+def test_wait_policy_blocks_until_there_is_room(wait_for):
+    handled, done = [], []
+
+    async def run():
+        executor, release = blocking_executor("wait", handled)
+        await fill(executor, wait_for, done)
+        submit = asyncio.create_task(executor.submit(Booking, "third"))
+        await asyncio.sleep(0.05)
+        assert not submit.done()
+        release.set()
+        await asyncio.wait_for(submit, 1.0)
+        await executor.stop(1.0)
+
+    asyncio.run(run())
+    assert handled == ["first", "second", "third"]
+
+
+def test_urgent_events_start_before_waiting_low_priority_ones(wait_for):
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def handle_booking(event):
+            if event == "blocker":
+                await release.wait()
+            order.append(event)
+
+        async def handle_alert(event):
+            order.append(event)
+
+        executor = HandlerExecutor(workers=2, queue_size=4, max_concurrency=1)
+        executor.add(Booking, handle_booking, priority=Priority.LOW)
+        executor.add(Alert, handle_alert, priority=Priority.URGENT)
+        await executor.submit(Booking, "blocker")
+        await wait_for(lambda: executor.gate.active == 1)
+        await executor.submit(Booking, "booking")
+        await wait_for(lambda: len(executor.gate._waiters) == 1)
+        await executor.submit(Alert, "alert")
+        await wait_for(lambda: len(executor.gate._waiters) == 2)
+        release.set()
+        await executor.stop(1.0)
+        return executor.priority_stats()
+
+    stats = asyncio.run(run())
+    assert order == ["blocker", "alert", "booking"]
+    assert stats["URGENT"]["count"] == 1 and stats["LOW"]["count"] == 2
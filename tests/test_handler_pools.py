@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import threading
+
+import httpx
+import pytest
+
+from maoto_agent import Maoto, NewOfferCallResponse, OfferCall
+
+
+def respond_with_pid(offercall: OfferCall) -> NewOfferCallResponse:
+    """Process handler, module-level so the pool workers can import it."""
+    return NewOfferCallResponse(
+        offercall_id=offercall.id,
+        offercallable_id=offercall.offercallable_id,
+        description=str(os.getpid()),
+    )
+
+
+def test_process_handler_runs_in_a_worker_and_its_response_is_sent(
+    monkeypatch, make_offercall, post_event, mock_upstream, wait_for
+):
+    monkeypatch.setenv("MAOTO_HANDLER_PROCESS_WORKERS", "1")
+    sent = []
+
+    def marketplace(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json=True)
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, marketplace)
+        maoto.register_handler(OfferCall, executor="process")(respond_with_pid)
+        offercall = make_offercall()
+        async with maoto.router.lifespan_context(maoto):
+            await post_event(maoto, offercall)
+            await wait_for(lambda: sent, timeout=30)
+        return offercall, maoto._pools.runs
+
+    offercall, runs = asyncio.run(run())
+    (response,) = sent
+    assert response["offercall_id"] == str(offercall.id)
+    assert int(response["description"]) != os.getpid()
+    assert runs == {"thread": 0, "process": 1}
+
+
+def test_sync_handler_runs_in_the_thread_pool(make_offercall, post_event, wait_for):
+    threads = []
+
+    async def run():
+        maoto = Maoto()
+
+        @maoto.register_handler(OfferCall)
+        def handle(offercall):
+            threads.append(threading.current_thread().name)
+
+        async with maoto.router.lifespan_context(maoto):
+            await post_event(maoto, make_offercall())
+            await wait_for(lambda: threads)
+        return maoto._pools.runs
+
+    assert asyncio.run(run()) == {"thread": 1, "process": 0}
+    assert threads[0].startswith("maoto-handler")
+
+
+def test_rejects_handlers_a_pool_cannot_run():
+    maoto = Maoto()
+
+    async def handle_async(offercall):
+        pass
+
+    def handle_nested(offercall):
+        pass
+
+    with pytest.raises(ValueError, match="cannot run with executor='thread'"):
+        maoto.register_handler(OfferCall, executor="thread")(handle_async)
+    with pytest.raises(ValueError, match="module-level"):
+        maoto.register_handler(OfferCall, executor="process")(handle_nested)
+    with pytest.raises(ValueError, match="Unsupported executor"):
+        maoto.register_handler(OfferCall, executor="fiber")(handle_nested)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import random
+import uuid
+from contextlib import aclosing
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from maoto_agent import Maoto, Skill
+from maoto_agent.json_stream import JsonArraySplitter
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    choice = rng.random()
+    if depth > 3 or choice < 0.3:
+        return rng.choice([1, -2.5, True, None, 'a\\"b,]}{[', "é ", ""])
+    if choice < 0.65:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return {f'k{i}"]': random_value(rng, depth + 1) for i in range(rng.randint(0, 3))}
+
+
+def split(body: bytes, chunk_sizes) -> tuple[list, JsonArraySplitter]:
+    splitter = JsonArraySplitter()
+    items = []
+    pos = 0
+    for size in chunk_sizes:
+        if pos >= len(body):
+            break
+        items += splitter.feed(body[pos : pos + size])
+        pos += size
+    return [json.loads(item) for item in items], splitter
+
+
+def test_splits_an_array_fed_at_once():
+    array = [{"id": 1, "tags": ["a", "b"]}, "text, with ] and }", 3.5, None, [[]]]
+    items, splitter = split(json.dumps(array).encode(), [10**6])
+    assert items == array
+    assert splitter.finished
+
+
+def test_splits_an_array_fed_byte_by_byte():
+    array = [{"escaped": 'quote \\" and backslash \\\\'}, "é", {}]
+    body = json.dumps(array, ensure_ascii=False, indent=2).encode()
+    items, splitter = split(body, [1] * len(body))
+    assert items == array
+    assert splitter.finished
+
+
+def test_splits_random_arrays_in_random_chunks():
+    rng = random.Random(1)
+    for _ in range(500):
+        array = [random_value(rng) for _ in range(rng.randint(0, 6))]
+        body = json.dumps(
+            array, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 1])
+        ).encode()
+        chunk_sizes = [rng.randint(1, 7) for _ in range(len(body))]
+        items, splitter = split(body, chunk_sizes)
+        assert items == array, body
+        assert splitter.finished
+
+
+def test_empty_array():
+    items, splitter = split(b" [ ] ", [2, 2, 2])
+    assert items == []
+    assert splitter.finished
+
+
+def test_returns_each_item_once_the_chunk_completes_it():
+    splitter = JsonArraySplitter()
+    assert splitter.feed(b'[{"a": 1') == []
+    assert splitter.feed(b'}, {"b"') == [b'{"a": 1}']
+    assert splitter.feed(b": 2}]") == [b'{"b": 2}']
+    assert splitter.finished
+    assert splitter.feed(b"[3]") == []
+
+
+def test_rejects_a_top_level_object():
+    with pytest.raises(ValueError):
+        JsonArraySplitter().feed(b'{"a": 1}')
+
+
+class TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: list[bytes]):
+        self.chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+def skill_json() -> bytes:
+    return (
+        Skill(
+            id=uuid.uuid4(),
+            apikey_id=uuid.uuid4(),
+            time=datetime.now(timezone.utc),
+            description="Book hotels",
+            params={},
+            solver_id=None,
+            tags=["travel"],
+        )
+        .model_dump_json()
+        .encode()
+    )
+
+
+def test_iter_registered_closes_the_response_when_left_early(mock_upstream):
+    stream = TrackedStream([b"[", skill_json(), b",", skill_json(), b"]"])
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, lambda request: httpx.Response(200, stream=stream))
+        try:
+            async with aclosing(maoto.iter_registered(Skill)) as skills:
+                async for skill in skills:
+                    assert skill.tags == ["travel"]
+                    break
+            return stream.closed
+        finally:
+            await maoto.aclose()
+
+    assert asyncio.run(run())
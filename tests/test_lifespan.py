@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from maoto_agent import Maoto
+
+
+def test_runs_on_event_handlers():
+    calls = []
+    maoto = Maoto()
+
+    with pytest.deprecated_call():
+
+        @maoto.on_event("startup")
+        async def startup():
+            calls.append("startup")
+
+        @maoto.on_event("shutdown")
+        def shutdown():
+            calls.append("shutdown")
+
+    async def run():
+        async with maoto.router.lifespan_context(maoto):
+            assert calls == ["startup"]
+
+    asyncio.run(run())
+    assert calls == ["startup", "shutdown"]
+
+
+def test_runs_user_lifespan_with_on_event_handlers():
+    calls = []
+
+    @asynccontextmanager
+    async def lifespan(app):
+        calls.append("lifespan start")
+        yield {"ready": True}
+        calls.append("lifespan end")
+
+    maoto = Maoto(lifespan=lifespan)
+    with pytest.deprecated_call():
+        maoto.on_event("startup")(lambda: calls.append("startup"))
+        maoto.on_event("shutdown")(lambda: calls.append("shutdown"))
+
+    async def run():
+        async with maoto.router.lifespan_context(maoto) as state:
+            assert state == {"ready": True}
+
+    asyncio.run(run())
+    assert calls == ["startup", "lifespan start", "lifespan end", "shutdown"]
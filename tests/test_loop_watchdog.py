@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from maoto_agent import Maoto, OfferCall
+
+
+def block(seconds: float):
+    time.sleep(seconds)
+
+
+def test_stall_is_attributed_to_the_blocking_handler(
+    monkeypatch, make_offercall, post_event, wait_for
+):
+    monkeypatch.setenv("MAOTO_LOOP_WATCHDOG", "true")
+    monkeypatch.setenv("MAOTO_LOOP_LAG_INTERVAL", "0.02")
+    monkeypatch.setenv("MAOTO_LOOP_LAG_THRESHOLD", "0.1")
+
+    async def run():
+        maoto = Maoto()
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            block(0.4)
+
+        async with maoto.router.lifespan_context(maoto):
+            await post_event(maoto, make_offercall())
+            await wait_for(lambda: maoto.handler_stats()["OfferCall"]["processed"] == 1)
+            await wait_for(lambda: maoto.loop_lag_stats()["recent_stalls"][0]["duration"])
+            return maoto.loop_lag_stats()
+
+    stats = asyncio.run(run())
+    (stall,) = stats["recent_stalls"]
+    assert stats["stalls"] == 1 and stats["max"] >= 0.3
+    assert stall["event_type"] == "OfferCall"
+    assert stall["handler"].endswith(".handle")
+    assert stall["duration"] >= 0.3
+    assert any("block" in line for line in stall["stack"])
+
+
+def test_stall_outside_handlers_is_not_attributed(monkeypatch):
+    monkeypatch.setenv("MAOTO_LOOP_WATCHDOG", "true")
+    monkeypatch.setenv("MAOTO_LOOP_LAG_INTERVAL", "0.02")
+    monkeypatch.setenv("MAOTO_LOOP_LAG_THRESHOLD", "0.1")
+
+    async def run():
+        maoto = Maoto()
+        async with maoto.router.lifespan_context(maoto):
+            await asyncio.sleep(0.05)
+            block(0.3)
+            await asyncio.sleep(0.1)
+            return maoto.loop_lag_stats()
+
+    (stall,) = asyncio.run(run())["recent_stalls"]
+    assert stall["handler"] is None and stall["event_type"] is None
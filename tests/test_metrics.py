@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from maoto_agent import Maoto, OfferCall
+from maoto_agent.metrics import MetricsRegistry
+
+
+def test_renders_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    events = registry.counter("events_total", "Events.", ("event_type",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    registry.gauge("depth", "Depth.", lambda: {('a"b',): 3}, ("queue",))
+    events.inc("OfferCall")
+    events.inc("OfferCall", amount=2)
+    for value in (0.05, 0.1, 0.5, 7.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP events_total Events.",
+        "# TYPE events_total counter",
+        'events_total{event_type="OfferCall"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 7.65",
+        "latency_seconds_count 4",
+        "# HELP depth Depth.",
+        "# TYPE depth gauge",
+        'depth{queue="a\\"b"} 3',
+    ]
+
+
+def test_metrics_endpoint_counts_events_and_handler_runs(make_offercall, post_event, wait_for):
+    async def run():
+        maoto = Maoto()
+        handled = []
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            handled.append(offercall)
+            if len(handled) == 2:
+                raise ValueError("fully booked")
+
+        async with maoto.router.lifespan_context(maoto):
+            for _ in range(2):
+                await post_event(maoto, make_offercall())
+            await post_event(maoto, make_offercall(), headers={"Signature": "forged"})
+            await wait_for(lambda: maoto.handler_stats()["OfferCall"]["failed"] == 1)
+
+            transport = httpx.ASGITransport(app=maoto)
+            async with httpx.AsyncClient(transport=transport, base_url="http://agent") as client:
+                return await client.get("/metrics")
+
+    response = asyncio.run(run())
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert 'maoto_events_total{event_type="OfferCall",outcome="queued"} 2' in lines
+    assert "maoto_hmac_failures_total 1" in lines
+    assert 'maoto_handler_duration_seconds_count{event_type="OfferCall",status="ok"} 1' in lines
+    assert 'maoto_handler_duration_seconds_count{event_type="OfferCall",status="error"} 1' in lines
+    assert 'maoto_handler_queue_depth{event_type="OfferCall"} 0' in lines
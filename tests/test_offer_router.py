@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from maoto_agent import Intent, OfferRequest
+from maoto_agent.offer_router import OfferRouter
+
+HOTEL_SKILL = uuid.uuid4()
+FLIGHT_SKILL = uuid.uuid4()
+UNKNOWN_SKILL = uuid.uuid4()
+SOLVER = uuid.uuid4()
+
+handled: list[str] = []
+
+SKILL_TAGS = {
+    HOTEL_SKILL: ["travel", "hotel", "booking"],
+    FLIGHT_SKILL: ["travel", "flight"],
+}
+
+
+def offer_request(skill_id: uuid.UUID, solver_id: uuid.UUID | None = None) -> OfferRequest:
+    intent = Intent(
+        id=uuid.uuid4(),
+        apikey_id=uuid.uuid4(),
+        test=True,
+        time=datetime.now(timezone.utc),
+        resolved=False,
+        description="Book a hotel in Paris",
+        provider_id=None,
+        tags=[],
+    )
+    return OfferRequest(skill_id=skill_id, solver_id=solver_id, intent=intent)
+
+
+def handler(name: str):
+    async def handle(request: OfferRequest):
+        handled.append(name)
+
+    handle.__name__ = name
+    return handle
+
+
+def test_routes_by_skill_then_solver_then_tags_then_fallback():
+    router = OfferRouter(SKILL_TAGS.get)
+    by_skill, by_solver = handler("skill"), handler("solver")
+    by_tags, fallback = handler("tags"), handler("fallback")
+    router.add(fallback)
+    router.add(by_tags, tags=["hotel"])
+    router.add(by_solver, solver_id=SOLVER)
+    router.add(by_skill, skill_id=HOTEL_SKILL)
+
+    assert router.resolve(offer_request(HOTEL_SKILL, SOLVER)) is by_skill
+    assert router.resolve(offer_request(FLIGHT_SKILL, SOLVER)) is by_solver
+    assert router.resolve(offer_request(FLIGHT_SKILL)) is fallback
+    router.add(by_tags, tags=["flight"])
+    assert router.resolve(offer_request(FLIGHT_SKILL)) is by_tags
+    assert router.resolve(offer_request(UNKNOWN_SKILL)) is fallback
+    assert router.routed == {"skill": 1, "solver": 1, "tags": 1, "fallback": 2, "unrouted": 0}
+
+
+def test_prefers_the_tag_route_sharing_the_most_tags():
+    router = OfferRouter(SKILL_TAGS.get)
+    travel, hotel_booking = handler("travel"), handler("hotel_booking")
+    router.add(travel, tags=["travel", "flight"])
+    router.add(hotel_booking, tags=["hotel", "booking", "spa"])
+
+    assert router.resolve(offer_request(HOTEL_SKILL)) is hotel_booking
+    assert router.resolve(offer_request(FLIGHT_SKILL)) is travel
+
+
+def test_breaks_tag_ties_by_registration_order():
+    router = OfferRouter(SKILL_TAGS.get)
+    first, second = handler("first"), handler("second")
+    router.add(first, tags=["hotel"])
+    router.add(second, tags=["booking"])
+
+    assert router.resolve(offer_request(HOTEL_SKILL)) is first
+
+
+def test_returns_none_without_a_matching_route():
+    router = OfferRouter(SKILL_TAGS.get)
+    router.add(handler("flight"), tags=["flight"])
+
+    assert router.resolve(offer_request(HOTEL_SKILL)) is None
+    assert router.resolve(offer_request(UNKNOWN_SKILL)) is None
+    assert router.routed["unrouted"] == 2
+
+
+def test_dispatch_calls_the_resolved_handler():
+    router = OfferRouter(SKILL_TAGS.get)
+    router.add(handler("hotel"), skill_id=HOTEL_SKILL)
+    handled.clear()
+
+    asyncio.run(router.dispatch(offer_request(HOTEL_SKILL)))
+    asyncio.run(router.dispatch(offer_request(FLIGHT_SKILL)))
+    assert handled == ["hotel"]
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from maoto_agent import Maoto, OfferCall, OfferCallable
+
+
+def offercallable() -> OfferCallable:
+    return OfferCallable(
+        id=uuid.uuid4(),
+        time=datetime.now(timezone.utc),
+        apikey_id=uuid.uuid4(),
+        solver_id=None,
+        description="Book a hotel",
+        params={"nights": {"type": "integer", "minimum": 1}},
+        tags=[],
+        followup=False,
+        cost=None,
+    )
+
+
+def test_rejects_invalid_args(monkeypatch, make_offercall, post_event):
+    monkeypatch.setenv("MAOTO_OFFERCALL_VALIDATION", "reject")
+    handled = []
+
+    async def run():
+        maoto = Maoto()
+        offer = offercallable()
+        maoto.registry.put(offer)
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            handled.append(offercall)
+
+        async with maoto.router.lifespan_context(maoto):
+            invalid = make_offercall(offercallable_id=offer.id, args={"nights": 0})
+            response = await post_event(maoto, invalid)
+        return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "args", "nights"]
+    assert handled == []
+
+
+def test_refund_of_invalid_call_is_sent_before_shutdown(
+    monkeypatch, make_offercall, post_event, mock_upstream
+):
+    monkeypatch.setenv("MAOTO_OFFERCALL_VALIDATION", "refund")
+    refunded = []
+
+    async def marketplace(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/refundOfferCall"
+        await asyncio.sleep(0.2)
+        refunded.append(json.loads(request.content)["id"])
+        return httpx.Response(200, json=True)
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, marketplace)
+        offer = offercallable()
+        maoto.registry.put(offer)
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            raise AssertionError("invalid calls must not reach the handler")
+
+        async with maoto.router.lifespan_context(maoto):
+            invalid = make_offercall(offercallable_id=offer.id, args={"nights": "two"})
+            response = await post_event(maoto, invalid)
+            assert response.status_code == 200
+        return invalid
+
+    invalid = asyncio.run(run())
+    assert refunded == [str(invalid.id)]
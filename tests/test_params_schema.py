@@ -0,0 +1,101 @@
+from maoto_agent.params_schema import compile_params
+
+
+def error_locs(params: dict, args) -> list[tuple]:
+    return [error["loc"] for error in compile_params(params)(args, ("args",))]
+
+
+def test_shorthand_maps_argument_names_to_types():
+    params = {"destination": "string", "nights": {"type": "integer", "minimum": 1}}
+    assert error_locs(params, {"destination": "Paris", "nights": 2}) == []
+    assert error_locs(params, {"destination": 3, "nights": 0}) == [
+        ("args", "destination"),
+        ("args", "nights"),
+    ]
+
+
+def test_shorthand_allows_an_argument_named_type():
+    params = {"type": "string", "count": "integer"}
+    assert error_locs(params, {"type": "hotel", "count": 1}) == []
+    assert error_locs(params, {"type": 1, "count": 1}) == [("args", "type")]
+
+
+def test_shorthand_with_a_schema_valued_type_argument():
+    params = {"type": {"type": "string", "enum": ["hotel", "flight"]}}
+    assert error_locs(params, {"type": "hotel"}) == []
+    assert error_locs(params, {"type": "train"}) == [("args", "type")]
+
+
+def test_json_schema_object():
+    params = {
+        "type": "object",
+        "properties": {"destination": {"type": "string"}, "nights": {"type": "integer"}},
+        "required": ["destination"],
+        "additionalProperties": False,
+    }
+    assert error_locs(params, {"destination": "Paris", "nights": 2}) == []
+    errors = compile_params(params)({"nights": "2", "pets": True}, ("args",))
+    assert [(error["loc"], error["type"]) for error in errors] == [
+        (("args", "destination"), "missing"),
+        (("args", "nights"), "type_error"),
+        (("args", "pets"), "extra_forbidden"),
+    ]
+    assert error_locs(params, ["Paris"]) == [("args",)]
+
+
+def test_enum_and_bounds():
+    params = {
+        "room": {"enum": ["single", "double"]},
+        "guests": {"type": "integer", "minimum": 1, "maximum": 4},
+        "price": {"type": "number", "maximum": 99.5},
+    }
+    assert error_locs(params, {"room": "double", "guests": 4, "price": 99}) == []
+    assert error_locs(params, {"room": "suite", "guests": 5, "price": 100.0}) == [
+        ("args", "room"),
+        ("args", "guests"),
+        ("args", "price"),
+    ]
+    assert error_locs(params, {"guests": 0}) == [("args", "guests")]
+
+
+def test_booleans_are_not_numbers():
+    params = {"guests": "integer", "price": "number", "breakfast": "boolean"}
+    assert error_locs(params, {"guests": 2, "price": 1, "breakfast": False}) == []
+    assert error_locs(params, {"guests": True, "price": False, "breakfast": 1}) == [
+        ("args", "guests"),
+        ("args", "price"),
+        ("args", "breakfast"),
+    ]
+
+
+def test_string_length():
+    params = {"code": {"type": "string", "minLength": 2, "maxLength": 3}}
+    assert error_locs(params, {"code": "FR"}) == []
+    assert error_locs(params, {"code": "F"}) == [("args", "code")]
+    assert error_locs(params, {"code": "FRAN"}) == [("args", "code")]
+
+
+def test_array_items_and_nested_objects():
+    params = {
+        "rooms": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"beds": {"type": "integer"}},
+                "required": ["beds"],
+            },
+        },
+        "tags": {"type": "array", "items": "string"},
+    }
+    assert error_locs(params, {"rooms": [{"beds": 1}], "tags": ["quiet"]}) == []
+    assert error_locs(params, {"rooms": [{"beds": 1}, {}, {"beds": "2"}], "tags": ["a", 1]}) == [
+        ("args", "rooms", 1, "beds"),
+        ("args", "rooms", 2, "beds"),
+        ("args", "tags", 1),
+    ]
+
+
+def test_union_types_and_unknown_keywords():
+    params = {"note": {"type": ["string", "null"], "format": "anything"}, "extra": 42}
+    assert error_locs(params, {"note": None, "extra": "anything"}) == []
+    assert error_locs(params, {"note": 1}) == [("args", "note")]
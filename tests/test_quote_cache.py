@@ -0,0 +1,68 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from maoto_agent import Intent, Maoto, NewOfferCallableCostResponse, OfferCallableCostRequest
+
+OFFERCALLABLE_ID = uuid.uuid4()
+
+
+def cost_request(description: str) -> OfferCallableCostRequest:
+    intent = Intent(
+        id=uuid.uuid4(),
+        apikey_id=uuid.uuid4(),
+        test=True,
+        time=datetime.now(timezone.utc),
+        resolved=False,
+        description=description,
+        provider_id=None,
+        tags=[],
+    )
+    return OfferCallableCostRequest(
+        offercallable_id=OFFERCALLABLE_ID, solver_id=None, intent=intent
+    )
+
+
+def test_cached_quote_is_sent_before_shutdown(post_event, mock_upstream, wait_for):
+    sent = []
+    handled = []
+
+    async def marketplace(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/NewOfferCallableCostResponse"
+        await asyncio.sleep(0.2)
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json=None)
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, marketplace)
+
+        @maoto.register_handler(
+            OfferCallableCostRequest, quote_key=lambda request: request.intent.description
+        )
+        async def quote(request):
+            handled.append(request)
+            await maoto.send_response(
+                NewOfferCallableCostResponse(
+                    offercallable_id=request.offercallable_id,
+                    intent_id=request.intent.id,
+                    cost=12.5,
+                )
+            )
+
+        async with maoto.router.lifespan_context(maoto):
+            first, second = cost_request("2 nights in Paris"), cost_request("2 nights in Paris")
+            assert (await post_event(maoto, first)).status_code == 200
+            await wait_for(lambda: len(sent) == 1)
+            assert (await post_event(maoto, second)).status_code == 200
+            metrics = maoto.metrics.render()
+        return first, second, metrics
+
+    first, second, metrics = asyncio.run(run())
+    assert handled == [first]
+    assert [quote["intent_id"] for quote in sent] == [str(first.intent.id), str(second.intent.id)]
+    assert [quote["cost"] for quote in sent] == [12.5, 12.5]
+    assert 'maoto_quote_cache_hits_total{request_type="OfferCallableCostRequest"} 1' in metrics
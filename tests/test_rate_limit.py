@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import httpx
+
+from maoto_agent import Maoto
+from maoto_agent.rate_limit import RateLimiter, TokenBucket
+
+
+def test_bucket_spaces_calls_at_the_configured_rate():
+    async def run():
+        bucket = TokenBucket(rate=20.0, burst=1.0)
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - start, bucket.stats()
+
+    elapsed, stats = asyncio.run(run())
+    assert elapsed >= 0.09
+    assert stats["waits"] == 2
+
+
+def test_learns_a_lower_rate_from_ratelimit_headers():
+    limiter = RateLimiter({"mp:intents": 100.0}, burst_seconds=1.0)
+    headers = {"RateLimit-Limit": "30", "RateLimit-Remaining": "29", "RateLimit-Policy": "30;w=60"}
+    limiter.observe("mp", "/intents?page=2", httpx.Response(200, headers=headers))
+    assert limiter.stats()["mp:intents"]["rate"] == 0.5
+    assert limiter.stats()["mp:intents"]["tokens"] == 29
+
+    limiter.observe("mp", "intents", httpx.Response(200, headers={"RateLimit-Limit": "1000"}))
+    assert limiter.stats()["mp:intents"]["rate"] == 0.5, "a limit without a window is ignored"
+
+
+def test_retry_after_pauses_the_whole_upstream():
+    limiter = RateLimiter({}, burst_seconds=1.0)
+    limiter.observe("pa", "message", httpx.Response(429, headers={"Retry-After": "30"}))
+    assert limiter.stats()["pa"]["pauses"] == 1
+    assert "pa:message" not in limiter.stats()
+
+
+def test_used_up_quota_delays_the_next_call(monkeypatch, mock_upstream):
+    monkeypatch.setenv("MAOTO_RATE_LIMITS", '{"mp": 1000}')
+    sent = []
+
+    def marketplace(request: httpx.Request) -> httpx.Response:
+        sent.append(time.monotonic())
+        headers = {
+            "X-RateLimit-Limit": "20",
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": "0.2",
+        }
+        return httpx.Response(200, text="ok", headers=headers)
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, marketplace)
+        try:
+            for _ in range(2):
+                await maoto._request(
+                    "GET", input=None, result_type=str, route="quota", url=maoto._settings.url_mp
+                )
+            return maoto.rate_limit_stats()
+        finally:
+            await maoto.aclose()
+
+    stats = asyncio.run(run())
+    assert sent[1] - sent[0] >= 0.15
+    assert stats["mp:quota"]["pauses"] == 2 and stats["mp:quota"]["waits"] == 1
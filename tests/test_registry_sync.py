@@ -0,0 +1,132 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from maoto_agent import Maoto, NewOfferCallable, NewSkill, Skill
+from maoto_agent.registry_sync import plan_sync
+
+SOLVER_ID = uuid.uuid4()
+
+
+def new_skill(description: str, tags: list[str] | None = None) -> NewSkill:
+    return NewSkill(description=description, params={}, solver_id=SOLVER_ID, tags=tags or [])
+
+
+def registered(new: NewSkill) -> Skill:
+    return Skill(
+        **new.model_dump(),
+        id=uuid.uuid4(),
+        apikey_id=uuid.uuid4(),
+        time=datetime.now(timezone.utc),
+    )
+
+
+def test_registers_missing_objects():
+    desired = [new_skill("book hotels"), new_skill("book flights")]
+    assert plan_sync([], desired, prune=False) == (desired, [], [], 0)
+
+
+def test_keeps_unchanged_objects():
+    desired = [new_skill("book hotels", ["travel"])]
+    current = [registered(desired[0])]
+    assert plan_sync(current, desired, prune=True) == ([], [], [], 1)
+
+
+def test_replaces_changed_objects():
+    current = [registered(new_skill("book hotels", ["travel"]))]
+    desired = [new_skill("book hotels", ["travel", "hotel"])]
+    assert plan_sync(current, desired, prune=False) == ([], [(desired[0], current[0])], [], 0)
+
+
+def test_prunes_only_when_asked():
+    stale = registered(new_skill("book trains"))
+    desired = [new_skill("book hotels")]
+    current = [registered(desired[0]), stale]
+    assert plan_sync(current, desired, prune=False) == ([], [], [], 1)
+    assert plan_sync(current, desired, prune=True) == ([], [], [stale], 1)
+
+
+def test_removes_duplicate_registrations():
+    desired = [new_skill("book hotels")]
+    first, second = registered(desired[0]), registered(desired[0])
+    stale, stale_duplicate = registered(new_skill("old")), registered(new_skill("old"))
+    current = [first, second, stale, stale_duplicate]
+    assert plan_sync(current, desired, prune=False) == ([], [], [second], 1)
+    assert plan_sync(current, desired, prune=True) == (
+        [],
+        [],
+        [stale, second, stale_duplicate],
+        1,
+    )
+
+
+def test_ignores_repeated_desired_objects():
+    desired = [new_skill("book hotels"), new_skill("book hotels", ["other"])]
+    assert plan_sync([], desired, prune=False) == (desired[:1], [], [], 0)
+
+
+def test_keys_include_the_object_type():
+    skill = new_skill("book hotels")
+    offercallable = NewOfferCallable(
+        solver_id=SOLVER_ID,
+        description="book hotels",
+        params={},
+        tags=[],
+        followup=False,
+        cost=None,
+    )
+    current = [registered(skill)]
+    assert plan_sync(current, [skill, offercallable], prune=True) == ([offercallable], [], [], 1)
+
+
+def sync_with_marketplace(mock_upstream, current: list[Skill], desired, register_status: int):
+    calls = []
+
+    def marketplace(request: httpx.Request) -> httpx.Response:
+        route = request.url.path.lstrip("/")
+        calls.append(route)
+        if route == "getSkills":
+            return httpx.Response(
+                200, content=f"[{','.join(s.model_dump_json() for s in current)}]"
+            )
+        if route.startswith("get"):
+            return httpx.Response(200, json=[])
+        if route == "registerNewSkill" and register_status == 200:
+            return httpx.Response(
+                200, content=registered(NewSkill(**json.loads(request.content))).model_dump_json()
+            )
+        if route == "registerNewSkill":
+            return httpx.Response(register_status, json={"detail": "rejected"})
+        return httpx.Response(200, json=True)
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, marketplace)
+        try:
+            return await maoto.sync_registry(desired)
+        finally:
+            await maoto.aclose()
+
+    return asyncio.run(run()), calls
+
+
+def test_sync_replaces_changed_objects(mock_upstream):
+    current = [registered(new_skill("book hotels", ["travel"]))]
+    desired = [new_skill("book hotels", ["travel", "hotel"])]
+    report, calls = sync_with_marketplace(mock_upstream, current, desired, register_status=200)
+    assert report.errors == []
+    assert [skill.tags for skill in report.registered] == [["travel", "hotel"]]
+    assert report.unregistered == current
+    assert calls.index("registerNewSkill") < calls.index("unregisterSkill")
+
+
+def test_sync_keeps_the_old_object_when_its_replacement_fails(mock_upstream):
+    current = [registered(new_skill("book hotels", ["travel"]))]
+    desired = [new_skill("book hotels", ["travel", "hotel"])]
+    report, calls = sync_with_marketplace(mock_upstream, current, desired, register_status=500)
+    assert len(report.errors) == 1 and report.errors[0].startswith("register NewSkill")
+    assert report.registered == [] and report.unregistered == []
+    assert "unregisterSkill" not in calls
@@ -0,0 +1,204 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from maoto_agent import CircuitOpenError, Maoto
+from maoto_agent.retry import CircuitBreaker, RetryBudget, is_retryable, parse_retry_after
+
+
+def response(status: int, **headers) -> httpx.Response:
+    return httpx.Response(status, headers=headers)
+
+
+@pytest.mark.parametrize(
+    ("status", "headers", "idempotent", "expected"),
+    [
+        (429, {}, False, True),
+        (503, {"Retry-After": "1"}, False, True),
+        (503, {}, False, False),
+        (502, {}, False, False),
+        (504, {}, False, False),
+        (502, {}, True, True),
+        (503, {}, True, True),
+        (500, {}, True, False),
+        (404, {}, True, False),
+    ],
+)
+def test_is_retryable(status, headers, idempotent, expected):
+    assert is_retryable(response(status, **headers), idempotent) is expected
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(response(503, **{"Retry-After": "2.5"})) == 2.5
+    assert parse_retry_after(response(503, **{"Retry-After": "soon"})) is None
+    assert parse_retry_after(response(503)) is None
+
+
+def test_retry_budget_limits_retries_to_a_share_of_requests():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=2.0)
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+    assert budget.stats()["exhausted"] == 2
+
+
+def test_breaker_opens_probes_and_closes():
+    probes = []
+
+    async def probe():
+        probes.append(time.monotonic())
+        if len(probes) == 1:
+            raise httpx.ConnectError("still down")
+
+    async def run():
+        breaker = CircuitBreaker(
+            "marketplace", failure_threshold=2, reset_timeout=0.05, probe=probe
+        )
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await breaker.before_call()
+        assert probes == []
+
+        await asyncio.sleep(0.06)
+        with pytest.raises(CircuitOpenError):
+            await breaker.before_call()
+        assert breaker.state == "open" and len(probes) == 1
+
+        await asyncio.sleep(0.06)
+        await breaker.before_call()
+        assert breaker.state == "closed" and len(probes) == 2
+        return breaker.stats()
+
+    assert asyncio.run(run()) == {"state": "closed", "failures": 0, "opened": 2, "rejected": 2}
+
+
+def test_half_open_breaker_reopens_on_failure():
+    async def run():
+        breaker = CircuitBreaker("assistant", failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        await asyncio.sleep(0.02)
+        await breaker.before_call()
+        assert breaker.state == "half_open"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        await asyncio.sleep(0.02)
+        await breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        return breaker.opened
+
+    assert asyncio.run(run()) == 2
+
+
+@pytest.fixture
+def request_with(monkeypatch, mock_upstream):
+    """Send one request through a Maoto whose Marketplace answers with ``replies`` in turn."""
+    monkeypatch.setenv("MAOTO_RETRY_BASE_DELAY", "0.001")
+    monkeypatch.setenv("MAOTO_BREAKER_FAILURE_THRESHOLD", "100")
+
+    def send(method: str, replies: list, setup=None):
+        attempts = []
+
+        def marketplace(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            reply = replies[min(len(attempts), len(replies)) - 1]
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+        async def run():
+            maoto = Maoto()
+            mock_upstream(maoto, marketplace)
+            if setup is not None:
+                setup(maoto)
+            try:
+                return await maoto._request(
+                    method,
+                    input={} if method == "POST" else None,
+                    result_type=str,
+                    route="route",
+                    url=maoto._settings.url_mp,
+                )
+            finally:
+                await maoto.aclose()
+
+        try:
+            return asyncio.run(run()), len(attempts)
+        except Exception as exc:
+            return exc, len(attempts)
+
+    return send
+
+
+def test_get_is_retried_on_gateway_errors(request_with):
+    result, attempts = request_with(
+        "GET", [response(502), response(504), httpx.Response(200, text="ok")]
+    )
+    assert (result, attempts) == ("ok", 3)
+
+
+def test_get_gives_up_after_max_attempts(request_with):
+    result, attempts = request_with("GET", [response(503)])
+    assert isinstance(result, httpx.HTTPStatusError) and attempts == 3
+
+
+def test_post_is_not_retried_on_503_without_retry_after(request_with):
+    result, attempts = request_with("POST", [response(503), httpx.Response(200, text="ok")])
+    assert isinstance(result, httpx.HTTPStatusError)
+    assert result.response.status_code == 503 and attempts == 1
+
+
+def test_post_is_retried_on_503_with_retry_after_and_429(request_with):
+    replies = [response(503, **{"Retry-After": "0"}), response(429), httpx.Response(200, text="ok")]
+    assert request_with("POST", replies) == ("ok", 3)
+
+
+def test_post_is_retried_only_after_connect_errors(request_with):
+    replies = [httpx.ConnectError("refused"), httpx.Response(200, text="ok")]
+    assert request_with("POST", replies) == ("ok", 2)
+    result, attempts = request_with("POST", [httpx.RemoteProtocolError("disconnected")])
+    assert isinstance(result, httpx.RemoteProtocolError) and attempts == 1
+
+
+def test_exhausted_retry_budget_stops_retries(request_with):
+    def exhaust(maoto):
+        maoto._retry_budget.tokens = 0
+        maoto._retry_budget.min_per_second = 0
+
+    result, attempts = request_with("GET", [response(503), httpx.Response(200, text="ok")], exhaust)
+    assert isinstance(result, httpx.HTTPStatusError) and attempts == 1
+
+
+def test_open_breaker_fails_fast(monkeypatch, mock_upstream):
+    monkeypatch.setenv("MAOTO_RETRY_MAX_ATTEMPTS", "1")
+    monkeypatch.setenv("MAOTO_BREAKER_FAILURE_THRESHOLD", "2")
+    attempts = []
+
+    def marketplace(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        return response(500)
+
+    async def run():
+        maoto = Maoto()
+        mock_upstream(maoto, marketplace)
+        try:
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await maoto.get_own_apikey()
+            with pytest.raises(CircuitOpenError):
+                await maoto.get_own_apikey()
+            return maoto.breaker_stats()[str(maoto._settings.url_mp)]
+        finally:
+            await maoto.aclose()
+
+    stats = asyncio.run(run())
+    assert len(attempts) == 2
+    assert stats["state"] == "open" and stats["rejected"] == 1
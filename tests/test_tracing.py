@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+
+from maoto_agent import Maoto, NewOfferCallResponse, OfferCall, RingBufferExporter
+
+
+def test_event_and_response_share_one_trace(make_offercall, post_event, mock_upstream, wait_for):
+    exporter = RingBufferExporter()
+
+    def marketplace(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=True)
+
+    async def run():
+        maoto = Maoto(span_exporter=exporter)
+        mock_upstream(maoto, marketplace)
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            response = NewOfferCallResponse(
+                offercall_id=offercall.id,
+                offercallable_id=offercall.offercallable_id,
+                description="Booked",
+            )
+            await maoto.send_response(response)
+
+        offercall = make_offercall()
+        async with maoto.router.lifespan_context(maoto):
+            await post_event(maoto, offercall)
+            await wait_for(lambda: exporter.find("handle OfferCall"))
+        return offercall
+
+    offercall = asyncio.run(run())
+    (root,) = exporter.find("webhook OfferCall")
+    assert root.attributes["outcome"] == "queued"
+    spans = {span.name: span for span in exporter.trace(root.trace_id)}
+    assert list(spans) == [
+        "webhook OfferCall",
+        "verify_hmac",
+        "parse OfferCall",
+        "queue OfferCall",
+        "handle OfferCall",
+        "POST NewOfferCallResponse",
+    ]
+    assert spans["handle OfferCall"].parent_id == root.span_id
+    assert spans["POST NewOfferCallResponse"].parent_id == spans["handle OfferCall"].span_id
+    assert spans["POST NewOfferCallResponse"].attributes["offercall.id"] == str(offercall.id)
+    assert exporter.find(**{"offercall.id": str(offercall.id)})
+
+
+def test_rejected_webhook_ends_its_span_with_an_error(make_offercall, post_event):
+    exporter = RingBufferExporter()
+
+    async def run():
+        maoto = Maoto(span_exporter=exporter)
+
+        @maoto.register_handler(OfferCall)
+        async def handle(offercall):
+            pass
+
+        async with maoto.router.lifespan_context(maoto):
+            return await post_event(maoto, make_offercall(), headers={"Signature": "forged"})
+
+    assert asyncio.run(run()).status_code == 403
+    (root,) = exporter.find("webhook OfferCall")
+    assert root.status == "error" and root.end is not None
+    assert not exporter.find("handle")
+
+
+def test_tracing_is_off_without_an_exporter():
+    tracer = Maoto().tracer
+    assert not tracer.enabled
+    with tracer.span("anything") as span:
+        assert span is None